@@ -0,0 +1,143 @@
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, or_, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from .bulk_import import hash_passwords, insert_providers
+from .models import AccessRequest, AccessRequestCreate, User
+
+# Access-request intake and review. Emails are normalized before they are
+# stored; a unique partial index allows one pending request per email, and a
+# resubmission within DEDUP_WINDOW_HOURS adds no row. Submitters only get an
+# acknowledgement either way, so the endpoint never shows an existing request.
+# Admin review is batched: many requests are approved or rejected in one
+# transaction, and approvals create users and profiles with the bulk import's
+# multi-row inserts.
+
+DEDUP_WINDOW_HOURS = int(os.getenv("ACCESS_REQUEST_DEDUP_HOURS", "24"))
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+REVIEW_ACTIONS = {"approve": "approved", "reject": "rejected"}
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def submit_access_request(session: Session, data: AccessRequestCreate) -> bool:
+    """Insert a pending request unless this email already has a recent or pending one. Commits."""
+    values = data.model_dump(exclude={"status", "created_at"})
+    values["email"] = normalize_email(values["email"])
+    now = datetime.utcnow()
+
+    # Same email recently (any status): nothing to add
+    recent = session.exec(
+        select(AccessRequest.id)
+        .where(AccessRequest.email == values["email"])
+        .where(AccessRequest.created_at > now - timedelta(hours=DEDUP_WINDOW_HOURS))
+        .limit(1)
+    ).first()
+    if recent is not None:
+        return False
+
+    # Concurrent duplicates (double-clicks, bots) and older pending requests meet the partial unique index
+    inserted = session.execute(
+        pg_insert(AccessRequest)
+        .values(**values, status="pending", created_at=now)
+        .on_conflict_do_nothing(index_elements=["email"], index_where=text("status = 'pending'"))
+        .returning(AccessRequest.id)
+    ).scalar()
+    session.commit()
+    return inserted is not None
+
+
+def list_access_requests(
+    session: Session,
+    status: Optional[str] = "pending",
+    limit: int = PAGE_SIZE,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+) -> List[AccessRequest]:
+    """
+    Newest first, keyset-paginated: pass the created_at and id of the last row
+    of a page as before/before_id for the next one. With a status this is a
+    range scan on (status, created_at, id).
+    """
+    query = select(AccessRequest)
+    if status:
+        query = query.where(AccessRequest.status == status)
+    if before is not None:
+        if before_id is not None:
+            query = query.where(or_(
+                AccessRequest.created_at < before,
+                and_(AccessRequest.created_at == before, AccessRequest.id < before_id),
+            ))
+        else:
+            query = query.where(AccessRequest.created_at < before)
+    query = query.order_by(AccessRequest.created_at.desc(), AccessRequest.id.desc()).limit(min(limit, MAX_PAGE_SIZE))
+    return session.exec(query).all()
+
+
+def review_access_requests(session: Session, ids: List[int], action: str) -> Dict[str, Any]:
+    """
+    Approve or reject pending requests in one transaction. Approval creates a
+    user + profile per request and returns generated passwords to hand out;
+    requests whose email already has an account are marked approved but listed
+    under "existing" so the admin can tell that person to sign in. Commits.
+    """
+    new_status = REVIEW_ACTIONS[action]
+    now = datetime.utcnow()
+    ids = sorted(set(ids))
+    credentials: List[Dict[str, str]] = []
+
+    prepared: Dict[str, Any] = {}
+    if action == "approve":
+        # Hash before claiming the rows, so no locks are held during Argon2
+        pending = session.exec(
+            select(AccessRequest.email, AccessRequest.business_category, AccessRequest.city)
+            .where(AccessRequest.id.in_(ids))
+            .where(AccessRequest.status == "pending")
+        ).all()
+        emails = [email for email, _, _ in pending]
+        existing = set(session.exec(select(User.email).where(User.email.in_(emails))).all()) if emails else set()
+        new_requests = [row for row in pending if row[0] not in existing]
+        passwords = [secrets.token_urlsafe(8) for _ in new_requests]
+        hashes = hash_passwords(passwords)
+        prepared = {
+            email: ({"business_category": category, "service_area": city}, password, hashed)
+            for (email, category, city), password, hashed in zip(new_requests, passwords, hashes)
+        }
+
+    # Only rows still pending are claimed (a concurrent review takes the rest)
+    claimed = session.execute(
+        update(AccessRequest)
+        .where(AccessRequest.id.in_(ids))
+        .where(AccessRequest.status == "pending")
+        .values(status=new_status, reviewed_at=now)
+        .returning(AccessRequest.id, AccessRequest.email)
+    ).all()
+
+    created = 0
+    existing_ids: List[int] = []
+    if action == "approve":
+        existing_ids = [request_id for request_id, email in claimed if email not in prepared]
+        candidates = [(email, prepared[email][0]) for _, email in claimed if email in prepared]
+        if candidates:
+            insert_providers(session, candidates, [prepared[email][2] for email, _ in candidates])
+            credentials = [{"email": email, "password": prepared[email][1]} for email, _ in candidates]
+            created = len(candidates)
+    session.commit()
+
+    claimed_ids = {request_id for request_id, _ in claimed}
+    return {
+        "status": new_status,
+        "reviewed": len(claimed_ids),
+        "created": created,
+        "skipped": [request_id for request_id in ids if request_id not in claimed_ids],  # missing or no longer pending
+        "existing": existing_ids,  # approved, but the email already had an account
+        "credentials": credentials,
+    }
@@ -0,0 +1,117 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from .schedule import WEEKDAYS, CompiledSchedule
+from .tz import transitions_between
+
+# Utilisation heatmap: booked vs available minutes per (weekday, hour) over the
+# last N weeks. Both sides live on a (days, 1440) minute grid in the provider's
+# local wall time, so a year of history is a handful of array operations rather
+# than generate_slots per day plus a Python loop over bookings.
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 52
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+
+
+@lru_cache(maxsize=1024)
+def weekly_availability(schedule: CompiledSchedule) -> np.ndarray:
+    """
+    (7, 1440) bool grid of minutes covered by a slot, per weekday. Keyed on the
+    compiled schedule, which compile_schedule already shares per config.
+    """
+    grid = np.zeros((7, MINUTES_PER_DAY), dtype=bool)
+    for weekday, slots in enumerate(schedule.days):
+        for start, end, _ in slots:
+            grid[weekday, start:min(end, MINUTES_PER_DAY)] = True
+            if end > MINUTES_PER_DAY:
+                # Slot runs past midnight into the next weekday
+                grid[(weekday + 1) % 7, :end - MINUTES_PER_DAY] = True
+    grid.flags.writeable = False
+    return grid
+
+
+def epoch_seconds(utc_naive: datetime) -> int:
+    return int((utc_naive - EPOCH).total_seconds())
+
+
+def local_minutes(tz_name: str, utc_seconds: np.ndarray, origin: datetime) -> np.ndarray:
+    """Epoch seconds (UTC) -> minutes since `origin` (a local wall time), vectorized."""
+    if not len(utc_seconds):
+        return np.zeros(0, dtype=np.int64)
+    minutes = utc_seconds // 60
+    span_start = EPOCH + timedelta(minutes=int(minutes.min()))
+    span_end = EPOCH + timedelta(minutes=int(minutes.max()))
+    instants, offsets = transitions_between(tz_name, span_start, span_end)
+    instant_minutes = np.array([(instant - EPOCH) // MINUTE for instant in instants], dtype=np.int64)
+    offset_minutes = np.array([offset // MINUTE for offset in offsets], dtype=np.int64)
+    index = np.searchsorted(instant_minutes, minutes, side="right")
+    return minutes - (origin - EPOCH) // MINUTE + offset_minutes[index]
+
+
+def _by_weekday_hour(minutes: np.ndarray, weeks: int, first_weekday: int) -> np.ndarray:
+    """(days, 1440) -> (7, 24) totals with row 0 = Monday."""
+    hourly = minutes.reshape(weeks, 7, 24, 60).sum(axis=(0, 3))
+    return np.roll(hourly, first_weekday, axis=0)
+
+
+def availability_heatmap(
+    schedule: CompiledSchedule,
+    tz_name: str,
+    first_day: date,
+    weeks: int,
+    bookings: Sequence[Tuple[int, int]],
+) -> Dict[str, Any]:
+    """
+    `bookings` are (start, end) UTC epoch-second pairs overlapping the window
+    that starts at local midnight of `first_day` and lasts `weeks` whole weeks.
+    Plain integers (not datetimes) so the array is built without a per-row
+    Python conversion.
+    """
+    days = weeks * 7
+    total = days * MINUTES_PER_DAY
+    origin = datetime.combine(first_day, time.min)
+
+    # Weekly template tiled over the window (row i is first_day + i)
+    weekday_of_day = (first_day.weekday() + np.arange(days)) % 7
+    available = weekly_availability(schedule)[weekday_of_day]
+
+    # Occupancy via a difference array: +1 at each start minute, -1 at each end
+    spans = np.array(bookings, dtype=np.int64).reshape(-1, 2)
+    starts = np.clip(local_minutes(tz_name, spans[:, 0], origin), 0, total)
+    ends = np.clip(local_minutes(tz_name, spans[:, 1], origin), 0, total)
+    keep = ends > starts
+    delta = np.bincount(starts[keep], minlength=total + 1) - np.bincount(ends[keep], minlength=total + 1)
+    booked = (np.cumsum(delta[:total]) > 0).reshape(days, MINUTES_PER_DAY)
+
+    available_hours = _by_weekday_hour(available, weeks, first_day.weekday())
+    booked_hours = _by_weekday_hour(booked, weeks, first_day.weekday())
+    # Utilisation only counts bookings inside opening hours, so it stays within 0..1
+    used_hours = _by_weekday_hour(booked & available, weeks, first_day.weekday())
+    utilisation = np.divide(
+        used_hours, available_hours,
+        out=np.zeros(available_hours.shape, dtype=float),
+        where=available_hours > 0,
+    )
+
+    available_total = int(available_hours.sum())
+    return {
+        "weeks": weeks,
+        "from": first_day.isoformat(),
+        "to": (first_day + timedelta(days=days - 1)).isoformat(),
+        "timezone": tz_name,
+        "weekdays": WEEKDAYS,
+        "available": available_hours.tolist(),  # minutes, [weekday][hour]
+        "booked": booked_hours.tolist(),
+        "utilisation": np.round(utilisation, 3).tolist(),
+        "totals": {
+            "available_minutes": available_total,
+            "booked_minutes": int(booked.sum()),
+            "utilisation": round(int(used_hours.sum()) / available_total, 3) if available_total else 0.0,
+        },
+    }
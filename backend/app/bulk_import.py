@@ -0,0 +1,261 @@
+import csv
+import json
+import os
+import secrets
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+
+from email_validator import EmailNotValidError, validate_email
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from .auth import get_password_hash
+from .models import User, Profile
+from .tz import is_valid_timezone
+from .slugs import slugify, assign_unique_slugs
+
+# Bulk provider onboarding: rows are streamed from CSV/NDJSON, passwords are
+# hashed in a process pool (Argon2 is CPU bound), and each batch is written
+# with one multi-row INSERT for users and one for profiles.
+
+BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", str(os.cpu_count() or 1)))
+TRIAL_DAYS = 30
+POOL_THRESHOLD = 8  # below this, starting worker processes costs more than it saves
+
+PROFILE_FIELDS = ["business_name", "business_category", "service_area", "country", "timezone"]
+TEXT_FIELDS = ["email", "password", "slug"] + PROFILE_FIELDS
+
+
+class RowError:
+    """Stands in for a row that could not be read (bad JSON, undecodable bytes)."""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Union[Dict[str, Any], RowError]]:
+    """
+    Yield one dict per row without loading the file. Unreadable rows come out
+    as RowError; if the file itself can't be read further, a last RowError ends it.
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Unsupported format: {fmt}")
+    lines = iter(csv.DictReader(stream) if fmt == "csv" else stream)
+    while True:
+        try:
+            line = next(lines)
+        except StopIteration:
+            return
+        except (csv.Error, UnicodeDecodeError) as e:
+            yield RowError(f"Could not read the rest of the file: {e}")
+            return
+        if fmt == "csv":
+            yield line
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield RowError(f"Invalid JSON: {e}")
+            continue
+        yield row if isinstance(row, dict) else RowError("Expected a JSON object")
+
+
+def format_for(filename: str) -> str:
+    return "ndjson" if filename.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportReport:
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.skipped = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.credentials: List[Dict[str, str]] = []  # generated passwords, to hand out to providers
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "credentials": self.credentials,
+            "seconds": round(self.seconds, 2),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def hash_passwords(passwords: List[str], pool: Optional[ProcessPoolExecutor] = None, hash_workers: int = HASH_WORKERS) -> List[str]:
+    """Argon2 in a process pool; small lists without a pool are hashed inline."""
+    if pool is None:
+        if len(passwords) < POOL_THRESHOLD:
+            return [get_password_hash(password) for password in passwords]
+        with ProcessPoolExecutor(max_workers=hash_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return hash_passwords(passwords, pool, hash_workers)
+    chunksize = max(1, len(passwords) // (hash_workers * 4))
+    return list(pool.map(get_password_hash, passwords, chunksize=chunksize))
+
+
+def insert_providers(
+    session: Session,
+    candidates: List[Tuple[str, Dict[str, Any]]],
+    hashes: List[str],
+    assigned_slugs: Optional[Set[str]] = None,
+) -> Dict[str, int]:
+    """
+    Create users with their profiles for (email, row) pairs whose emails are
+    known to be new. One INSERT ... RETURNING for users, one INSERT for
+    profiles; the caller commits. Returns email -> user id.
+    """
+    trial_ends_at = datetime.utcnow() + timedelta(days=TRIAL_DAYS)
+    user_rows = [
+        {
+            "email": email,
+            "hashed_password": hashed,
+            "is_admin": False,
+            "trial_ends_at": trial_ends_at,
+            "onboarding_completed": True,
+            "is_active": True,
+        }
+        for (email, _), hashed in zip(candidates, hashes)
+    ]
+    user_ids = {
+        email: user_id
+        for user_id, email in session.execute(insert(User).returning(User.id, User.email), user_rows)
+    }
+
+    # Deterministic slugs, checked against the unique index in one query
+    bases = [slugify(row.get("slug") or row.get("business_name") or email.split("@")[0]) for email, row in candidates]
+    slugs = assign_unique_slugs(session, bases, assigned_slugs)
+    profile_rows = []
+    for (email, row), slug in zip(candidates, slugs):
+        profile = {field: row.get(field) or None for field in PROFILE_FIELDS}
+        profile.update({
+            "user_id": user_ids[email],
+            "business_name": profile["business_name"] or "New Business",
+            "business_category": profile["business_category"] or "Uncategorized",
+            "service_area": profile["service_area"] or "Remote",
+            "slug": slug,
+            "availability_config": {},
+            "booking_rules": {},
+        })
+        profile_rows.append(profile)
+    session.execute(insert(Profile), profile_rows)
+    return user_ids
+
+
+def _validate_row(row: Union[Dict[str, Any], RowError]) -> Tuple[Optional[str], Optional[str]]:
+    """(normalized email, None) for a usable row, else (None, error message)."""
+    if isinstance(row, RowError):
+        return None, row.message
+    for field in TEXT_FIELDS:
+        if row.get(field) is not None and not isinstance(row[field], str):
+            return None, f"{field} must be a string"
+    email = (row.get("email") or "").strip().lower()
+    try:
+        validate_email(email, check_deliverability=False)
+    except EmailNotValidError:
+        return None, "Invalid email"
+    if row.get("timezone") and not is_valid_timezone(row["timezone"]):
+        return None, "Unknown time zone"
+    return email, None
+
+
+def import_providers(
+    session: Session,
+    rows: Iterable[Union[Dict[str, Any], RowError]],
+    batch_size: int = BATCH_SIZE,
+    hash_workers: int = HASH_WORKERS,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+    report: Optional[ImportReport] = None,
+) -> ImportReport:
+    """
+    Batches commit one by one, so a failure never takes earlier batches (and
+    their generated passwords) with it: bad rows and failed batches are
+    recorded in report.errors and the import carries on. Pass `report` to keep
+    what was done even if the call is interrupted.
+    """
+    report = report or ImportReport()
+    seen: Set[str] = set()
+    assigned_slugs: Set[str] = set()
+
+    # spawn: safe to start from a server thread, children only need app.auth
+    with ProcessPoolExecutor(max_workers=hash_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for batch in _batches(rows, batch_size):
+            line_offset = report.processed
+            report.processed += len(batch)
+
+            # 1. Validate and dedupe (within the file and against the database)
+            candidates = []
+            row_numbers: Dict[str, int] = {}
+            for i, row in enumerate(batch):
+                email, error = _validate_row(row)
+                if error:
+                    report.errors.append({"row": line_offset + i + 1, "error": error})
+                    continue
+                if email in seen:
+                    report.skipped += 1
+                    continue
+                seen.add(email)
+                candidates.append((email, row))
+                row_numbers[email] = line_offset + i + 1
+
+            try:
+                if candidates:
+                    existing = set(session.exec(select(User.email).where(User.email.in_([email for email, _ in candidates]))).all())
+                    report.skipped += len(existing)
+                    candidates = [(email, row) for email, row in candidates if email not in existing]
+
+                if candidates:
+                    # 2. Hash passwords in parallel
+                    passwords = [row.get("password") or secrets.token_urlsafe(8) for _, row in candidates]
+                    hashes = hash_passwords(passwords, pool, hash_workers)
+
+                    # 3-4. Users and profiles, one multi-row INSERT each
+                    insert_providers(session, candidates, hashes, assigned_slugs)
+                    session.commit()
+
+                    report.created += len(candidates)
+                    report.credentials.extend(
+                        {"email": email, "password": password}
+                        for (email, row), password in zip(candidates, passwords)
+                        if not row.get("password")
+                    )
+            except Exception as e:
+                # Nothing of this batch was written; earlier batches stay committed
+                session.rollback()
+                seen.difference_update(email for email, _ in candidates)
+                for email, _ in candidates:
+                    report.errors.append({"row": row_numbers[email], "error": f"Batch failed: {e}"})
+                print(f"IMPORT: batch at row {line_offset + 1} failed: {e}")
+
+            if progress:
+                progress(report)
+
+    return report
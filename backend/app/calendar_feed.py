@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, Optional, Mapping
+
+from .models import Booking
+from .http_cache import make_etag, etag_matches
+
+PRODID = "-//WorkSlot//Provider Calendar//EN"
+FEED_STATUSES = ["confirmed"]  # Only confirmed bookings are published to calendars
+# Booking changes only patch the cache of the worker that handled them, so other
+# workers rebuild their copy after this many seconds at the latest
+CALENDAR_CACHE_TTL = float(os.getenv("CALENDAR_CACHE_TTL", "300"))
+
+
+def _escape(value: str) -> str:
+    # RFC 5545 TEXT escaping
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    # Content lines are limited to 75 octets, continuation lines start with a space
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts = []
+    current = ""
+    limit = 75
+    for char in line:
+        if len((current + char).encode("utf-8")) > limit:
+            parts.append(current)
+            current = char
+            limit = 74  # leading space of the continuation counts
+        else:
+            current += char
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _format_dt(value: datetime, utc: bool = True) -> str:
+    # Naive UTC, or a floating (wall-clock) time for providers without a time zone
+    return value.strftime("%Y%m%dT%H%M%SZ" if utc else "%Y%m%dT%H%M%S")
+
+
+def render_event(booking: Booking, utc: bool = True) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:booking-{booking.id}@workslot",
+        f"DTSTAMP:{_format_dt(booking.created_at)}",
+        f"DTSTART:{_format_dt(booking.start_time, utc)}",
+        f"DTEND:{_format_dt(booking.end_time, utc)}",
+        f"SUMMARY:{_escape(booking.customer_name)}",
+    ]
+    description = f"Customer: {booking.customer_name} <{booking.customer_email}>"
+    if booking.customer_comment:
+        description += f"\nComment: {booking.customer_comment}"
+    lines.append(f"DESCRIPTION:{_escape(description)}")
+    lines.append("END:VEVENT")
+    return "\r\n".join(_fold(line) for line in lines)
+
+
+class CalendarFeed:
+    """
+    Rendered .ics document for one provider. Events are kept individually so a
+    single booking change only re-renders that booking, not the whole calendar.
+    """
+
+    def __init__(self, provider_id: int, business_name: str, utc: bool = True):
+        self.provider_id = provider_id
+        self.business_name = business_name
+        self.utc = utc  # False: provider has no time zone, booking times are wall-clock
+        self.events: Dict[int, tuple] = {}  # booking id -> (start_time, rendered VEVENT)
+        self.body = b""
+        self.etag = ""
+        self.last_modified = ""
+        self.loaded_at = time.monotonic()
+
+    def rebuild(self):
+        header = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            _fold(f"X-WR-CALNAME:{_escape(self.business_name)}"),
+        ]
+        events = [event for _, event in sorted(self.events.values(), key=lambda e: e[0])]
+        self.body = ("\r\n".join(header + events + ["END:VCALENDAR"]) + "\r\n").encode("utf-8")
+        self.etag = make_etag(self.body)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.last_modified = format_datetime(now, usegmt=True)
+
+    def apply(self, booking: Booking) -> bool:
+        """Add, replace or drop a single booking. Returns True if the feed changed."""
+        if booking.status in FEED_STATUSES:
+            self.events[booking.id] = (booking.start_time, render_event(booking, self.utc))
+            return True
+        return self.events.pop(booking.id, None) is not None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified,
+            "Cache-Control": "private, no-cache",
+        }
+
+    def not_modified(self, request_headers: Mapping[str, str]) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return parsedate_to_datetime(self.last_modified) <= since
+        return False
+
+
+class CalendarFeedCache:
+    """
+    Process-local cache of rendered feeds keyed by calendar token.
+    Entries are patched in place when one of the provider's bookings changes,
+    so polling clients are answered without touching the database. Entries are
+    reloaded after `ttl` seconds to pick up changes made by other workers.
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl: float = CALENDAR_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._feeds: "OrderedDict[str, CalendarFeed]" = OrderedDict()
+        self._tokens: Dict[int, str] = {}  # provider id -> token of its cached feed
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[CalendarFeed]:
+        with self._lock:
+            feed = self._feeds.get(token)
+            if feed is None or time.monotonic() - feed.loaded_at > self.ttl:
+                return None
+            self._feeds.move_to_end(token)
+            return feed
+
+    def store(self, token: str, provider_id: int, business_name: str, bookings: List[Booking], utc: bool = True) -> CalendarFeed:
+        feed = CalendarFeed(provider_id, business_name, utc)
+        for booking in bookings:
+            feed.apply(booking)
+        feed.rebuild()
+        with self._lock:
+            old_token = self._tokens.get(provider_id)
+            if old_token is not None and old_token != token:
+                self._feeds.pop(old_token, None)
+            self._feeds[token] = feed
+            self._feeds.move_to_end(token)
+            self._tokens[provider_id] = token
+            while len(self._feeds) > self.max_entries:
+                _, evicted = self._feeds.popitem(last=False)
+                self._tokens.pop(evicted.provider_id, None)
+        return feed
+
+    def apply_booking(self, booking: Booking):
+        with self._lock:
+            token = self._tokens.get(booking.provider_id)
+            feed = self._feeds.get(token) if token else None
+            if feed is not None and feed.apply(booking):
+                feed.rebuild()
+
+    def invalidate_provider(self, provider_id: int):
+        with self._lock:
+            token = self._tokens.pop(provider_id, None)
+            if token is not None:
+                self._feeds.pop(token, None)
+
+
+calendar_cache = CalendarFeedCache()
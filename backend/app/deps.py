@@ -9,15 +9,8 @@ from .auth import SECRET_KEY, ALGORITHM
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 def get_session():
-    print("DEBUG: get_session called")
-    try:
-        with Session(engine) as session:
-            print("DEBUG: Session created, yielding")
-            yield session
-            print("DEBUG: Session closed")
-    except Exception as e:
-        print(f"DEBUG ERROR in get_session: {e}")
-        raise e
+    with Session(engine) as session:
+        yield session
 
 async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)):
     credentials_exception = HTTPException(
@@ -28,7 +21,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("typ") == "refresh":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
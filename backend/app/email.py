@@ -1,21 +1,43 @@
 import os
 from typing import Optional
-import resend
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class EmailService:
     def __init__(self):
+        # Cheap at import time: the Resend SDK is only loaded on first send
         self.api_key = os.getenv("RESEND_API_KEY")
         self.from_email = os.getenv("EMAIL_FROM", "onboarding@resend.dev") # Default Resend testing email
+        self._resend = None
         
         if self.api_key:
-            resend.api_key = self.api_key
             print("EmailService: Resend Enabled")
         else:
             print("EmailService: Mock Mode (No RESEND_API_KEY)")
 
+    def _client(self):
+        if self._resend is None:
+            import resend
+            resend.api_key = self.api_key
+            self._resend = resend
+        return self._resend
+
+    def _send(self, to_email: str, subject: str, body: str):
+        if self.api_key:
+            try:
+                r = self._client().Emails.send({
+                    "from": self.from_email,
+                    "to": to_email,
+                    "subject": subject,
+                    "text": body
+                })
+                print(f"EMAIL SENT (Resend) to {to_email}: {r}")
+            except Exception as e:
+                print(f"EMAIL FAILURE (Resend) to {to_email}: {e}")
+        else:
+            print(f"EMAIL MOCK to {to_email}: {subject} | {body}")
+
     async def send_provider_notification(self, provider_email: str, customer_name: str, booking_link: str):
         subject = "New booking awaiting approval"
         body = f"""
@@ -30,19 +52,7 @@ class EmailService:
         WorkSlot
         """
         
-        if self.api_key:
-            try:
-                r = resend.Emails.send({
-                    "from": self.from_email,
-                    "to": provider_email,
-                    "subject": subject,
-                    "text": body
-                })
-                print(f"EMAIL SENT (Resend) to {provider_email}: {r}")
-            except Exception as e:
-                print(f"EMAIL FAILURE (Resend) to {provider_email}: {e}")
-        else:
-            print(f"EMAIL MOCK to {provider_email}: {subject} | {body}")
+        self._send(provider_email, subject, body)
 
     async def send_customer_update(self, customer_email: str, status: str, business_name: str, comment: Optional[str] = None):
         subject = f"Booking {status.capitalize()} - {business_name}"
@@ -57,18 +67,6 @@ class EmailService:
             
         body += "\nRegards,\nWorkSlot"
 
-        if self.api_key:
-            try:
-                r = resend.Emails.send({
-                    "from": self.from_email,
-                    "to": customer_email,
-                    "subject": subject,
-                    "text": body
-                })
-                print(f"EMAIL SENT (Resend) to {customer_email}: {r}")
-            except Exception as e:
-                print(f"EMAIL FAILURE (Resend) to {customer_email}: {e}")
-        else:
-            print(f"EMAIL MOCK to {customer_email}: {subject} | {body}")
+        self._send(customer_email, subject, body)
 
 email_service = EmailService()
@@ -0,0 +1,40 @@
+import os
+import threading
+import time
+from typing import Dict, Any
+
+from .database import get_db_revision, get_head_revision, pool_has_capacity
+
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "10"))
+
+_lock = threading.Lock()
+_cached: Dict[str, Any] = {"checked_at": 0.0, "result": None}
+
+
+def _check_schema() -> Dict[str, Any]:
+    try:
+        current = get_db_revision()
+    except Exception as e:
+        return {"ready": False, "reason": f"database unavailable: {e.__class__.__name__}"}
+    head = get_head_revision()
+    if current != head:
+        return {"ready": False, "reason": f"schema at {current}, expected {head}"}
+    return {"ready": True, "revision": current}
+
+
+def readiness() -> Dict[str, Any]:
+    """
+    Pool capacity is checked on every probe (in memory). The database/migration
+    check runs at most once per READINESS_CACHE_SECONDS, probes in between reuse it.
+    """
+    if not pool_has_capacity():
+        return {"ready": False, "reason": "connection pool exhausted"}
+
+    now = time.monotonic()
+    with _lock:
+        if _cached["result"] is not None and now - _cached["checked_at"] < READINESS_CACHE_SECONDS:
+            return _cached["result"]
+        result = _check_schema()
+        _cached["result"] = result
+        _cached["checked_at"] = now
+        return result
@@ -0,0 +1,321 @@
+import calendar
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Short-lived slot holds: a customer who picks a slot gets it reserved for a
+# few minutes while filling in the form. Holds live in a TTL store, not the
+# booking table, so abandoned clicks cost no DB writes and two customers
+# racing for the same slot are sorted out before any transaction starts.
+
+HOLD_TTL_SECONDS = int(os.getenv("HOLD_TTL_SECONDS", "300"))
+MAX_HOLDS_PER_PROVIDER = int(os.getenv("MAX_HOLDS_PER_PROVIDER", "200"))
+# Live holds one client (IP) may have at a time, across providers. A customer
+# needs one; the cap stops a single client from holding a whole calendar.
+MAX_HOLDS_PER_CLIENT = int(os.getenv("MAX_HOLDS_PER_CLIENT", "3"))
+
+
+class TooManyHolds(Exception):
+    """The client already holds MAX_HOLDS_PER_CLIENT slots."""
+
+
+class HoldsUnavailable(Exception):
+    """No store shared by all workers: a hold could not be enforced."""
+
+
+class Hold(NamedTuple):
+    token: str
+    provider_id: int
+    start: datetime  # naive UTC
+    end: datetime
+    expires_at: datetime
+
+
+def new_token(provider_id: int) -> str:
+    # Carries the provider so a hold can be released from the token alone
+    return f"{provider_id}.{secrets.token_urlsafe(16)}"
+
+
+def provider_of(token: str) -> Optional[int]:
+    provider, _, _ = token.partition(".")
+    return int(provider) if provider.isdigit() else None
+
+
+def _epoch(value: datetime) -> int:
+    return calendar.timegm(value.timetuple())
+
+
+class HoldStore:
+    """
+    acquire() returns None when an overlapping slot is held by someone else,
+    and raises TooManyHolds when `client` is at its cap. `replace_token`
+    releases the caller's previous hold in the same step.
+    """
+
+    async def acquire(
+        self, provider_id: int, start: datetime, end: datetime, client: str, replace_token: Optional[str] = None
+    ) -> Optional[Hold]:
+        raise NotImplementedError
+
+    async def release(self, token: str) -> bool:
+        raise NotImplementedError
+
+    async def held(
+        self, provider_id: int, start: datetime, end: datetime, exclude_token: Optional[str] = None
+    ) -> List[Tuple[datetime, datetime]]:
+        """(start, end) of live holds overlapping [start, end), other than `exclude_token`."""
+        raise NotImplementedError
+
+
+class MemoryHoldStore(HoldStore):
+    """
+    Per-process holds, only used with a single worker; with several workers
+    set HOLDS_REDIS_URL so every worker sees the same holds.
+    """
+
+    def __init__(self, ttl: int = HOLD_TTL_SECONDS, max_per_provider: int = MAX_HOLDS_PER_PROVIDER, max_per_client: int = MAX_HOLDS_PER_CLIENT):
+        self.ttl = ttl
+        self.max_per_provider = max_per_provider
+        self.max_per_client = max_per_client
+        self._holds: Dict[int, Dict[str, Tuple[Hold, float]]] = {}  # provider -> token -> (hold, deadline)
+        self._clients: Dict[str, Dict[str, float]] = {}  # client -> token -> deadline
+        self._owners: Dict[str, str] = {}  # token -> client
+        self._lock = threading.Lock()
+
+    def _live(self, provider_id: int, now: float) -> Dict[str, Tuple[Hold, float]]:
+        holds = self._holds.get(provider_id)
+        if holds is None:
+            return {}
+        expired = [token for token, (_, deadline) in holds.items() if deadline <= now]
+        for token in expired:
+            del holds[token]
+            self._forget(token)
+        if not holds:
+            del self._holds[provider_id]
+        return holds
+
+    def _forget(self, token: str):
+        client = self._owners.pop(token, None)
+        tokens = self._clients.get(client)
+        if tokens is not None:
+            tokens.pop(token, None)
+            if not tokens:
+                del self._clients[client]
+
+    def _client_holds(self, client: str, now: float) -> Dict[str, float]:
+        tokens = self._clients.get(client, {})
+        for token in [token for token, deadline in tokens.items() if deadline <= now]:
+            self._forget(token)
+        return self._clients.get(client, {})
+
+    async def acquire(self, provider_id, start, end, client, replace_token=None):
+        now = time.monotonic()
+        with self._lock:
+            client_holds = self._client_holds(client, now)
+            if len([token for token in client_holds if token != replace_token]) >= self.max_per_client:
+                raise TooManyHolds()
+            holds = self._live(provider_id, now)
+            for token, (hold, _) in holds.items():
+                if token != replace_token and hold.start < end and hold.end > start:
+                    return None
+            if len([token for token in holds if token != replace_token]) >= self.max_per_provider:
+                return None
+            if replace_token:
+                # May belong to another provider (customer switched provider)
+                self._drop(replace_token)
+
+            hold = Hold(new_token(provider_id), provider_id, start, end, datetime.utcfromtimestamp(time.time() + self.ttl))
+            self._holds.setdefault(provider_id, {})[hold.token] = (hold, now + self.ttl)
+            self._clients.setdefault(client, {})[hold.token] = now + self.ttl
+            self._owners[hold.token] = client
+            return hold
+
+    def _drop(self, token: str) -> bool:
+        provider_id = provider_of(token)
+        holds = self._holds.get(provider_id)
+        if not holds or holds.pop(token, None) is None:
+            return False
+        if not holds:
+            del self._holds[provider_id]
+        self._forget(token)
+        return True
+
+    async def release(self, token):
+        with self._lock:
+            return self._drop(token)
+
+    async def held(self, provider_id, start, end, exclude_token=None):
+        with self._lock:
+            holds = self._live(provider_id, time.monotonic())
+            return [
+                (hold.start, hold.end) for token, (hold, _) in holds.items()
+                if token != exclude_token and hold.start < end and hold.end > start
+            ]
+
+
+class RedisHoldStore(HoldStore):
+    """
+    Holds shared by all workers/instances: one sorted set per provider, members
+    "start:end:token" (epoch seconds) scored by expiry, and one per client with
+    its tokens. "hold-owner:<token>" names the client of a hold so a release
+    can update both. Uses the `redis` package.
+    """
+
+    # KEYS: provider set, client set, owner key of the new token, owner key and provider set of replace_token
+    ACQUIRE = """
+    local now = tonumber(ARGV[1])
+    local s = tonumber(ARGV[2])
+    local e = tonumber(ARGV[3])
+    local replace = ARGV[5]
+    local ttl = tonumber(ARGV[6])
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+    local client_holds = redis.call('ZCARD', KEYS[2])
+    if replace ~= '' and redis.call('ZSCORE', KEYS[2], replace) then
+        client_holds = client_holds - 1
+    end
+    if client_holds >= tonumber(ARGV[8]) then
+        return -1
+    end
+    local members = redis.call('ZRANGE', KEYS[1], 0, -1)
+    local provider_holds = #members
+    for _, member in ipairs(members) do
+        local hs, he, token = string.match(member, '^(%d+):(%d+):(.+)$')
+        if token == replace then
+            provider_holds = provider_holds - 1
+        elseif tonumber(hs) < e and tonumber(he) > s then
+            return 0
+        end
+    end
+    if provider_holds >= tonumber(ARGV[7]) then
+        return 0
+    end
+    if replace ~= '' then
+        local suffix = ':' .. replace
+        for _, member in ipairs(redis.call('ZRANGE', KEYS[5], 0, -1)) do
+            if string.sub(member, -#suffix) == suffix then
+                redis.call('ZREM', KEYS[5], member)
+                redis.call('ZREM', KEYS[2], replace)
+                redis.call('DEL', KEYS[4])
+                break
+            end
+        end
+    end
+    redis.call('ZADD', KEYS[1], now + ttl, s .. ':' .. e .. ':' .. ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ttl + 1)
+    redis.call('ZADD', KEYS[2], now + ttl, ARGV[4])
+    redis.call('EXPIRE', KEYS[2], ttl + 1)
+    redis.call('SET', KEYS[3], ARGV[9], 'EX', ttl + 1)
+    return 1
+    """
+
+    # KEYS: provider set, client set (or the owner key again if unknown), owner key
+    RELEASE = """
+    local suffix = ':' .. ARGV[1]
+    for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+        if string.sub(member, -#suffix) == suffix then
+            redis.call('ZREM', KEYS[1], member)
+            redis.call('ZREM', KEYS[2], ARGV[1])
+            redis.call('DEL', KEYS[3])
+            return 1
+        end
+    end
+    return 0
+    """
+
+    def __init__(self, url: str, ttl: int = HOLD_TTL_SECONDS, max_per_provider: int = MAX_HOLDS_PER_PROVIDER, max_per_client: int = MAX_HOLDS_PER_CLIENT):
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self.max_per_provider = max_per_provider
+        self.max_per_client = max_per_client
+        self._client = redis.from_url(url)
+        self._acquire = self._client.register_script(self.ACQUIRE)
+        self._release = self._client.register_script(self.RELEASE)
+
+    @staticmethod
+    def _key(provider_id: int) -> str:
+        return f"holds:{provider_id}"
+
+    @staticmethod
+    def _client_key(client: str) -> str:
+        return f"holds-client:{client}"
+
+    @staticmethod
+    def _owner_key(token: str) -> str:
+        return f"hold-owner:{token}"
+
+    async def acquire(self, provider_id, start, end, client, replace_token=None):
+        now = int(time.time())
+        token = new_token(provider_id)
+        ok = int(await self._acquire(
+            keys=[
+                self._key(provider_id),
+                self._client_key(client),
+                self._owner_key(token),
+                self._owner_key(replace_token or ""),
+                self._key(provider_of(replace_token or "") or provider_id),
+            ],
+            args=[now, _epoch(start), _epoch(end), token, replace_token or "", self.ttl, self.max_per_provider, self.max_per_client, client],
+        ))
+        if ok == -1:
+            raise TooManyHolds()
+        if not ok:
+            return None
+        return Hold(token, provider_id, start, end, datetime.utcfromtimestamp(now + self.ttl))
+
+    async def release(self, token):
+        provider_id = provider_of(token)
+        if provider_id is None:
+            return False
+        owner_key = self._owner_key(token)
+        owner = await self._client.get(owner_key)
+        client_key = self._client_key(owner.decode()) if owner else owner_key
+        return bool(int(await self._release(keys=[self._key(provider_id), client_key, owner_key], args=[token])))
+
+    async def held(self, provider_id, start, end, exclude_token=None):
+        members = await self._client.zrangebyscore(self._key(provider_id), f"({int(time.time())}", "+inf")
+        result = []
+        start_s, end_s = _epoch(start), _epoch(end)
+        for member in members:
+            hold_start, hold_end, token = member.decode().split(":", 2)
+            if token != exclude_token and int(hold_start) < end_s and int(hold_end) > start_s:
+                result.append((datetime.utcfromtimestamp(int(hold_start)), datetime.utcfromtimestamp(int(hold_end))))
+        return result
+
+
+class DisabledHoldStore(HoldStore):
+    """
+    Used when several workers run without HOLDS_REDIS_URL: per-process holds
+    would protect nothing, so none are handed out. Bookings still go through
+    the database's availability check.
+    """
+
+    async def acquire(self, provider_id, start, end, client, replace_token=None):
+        raise HoldsUnavailable()
+
+    async def release(self, token):
+        return False
+
+    async def held(self, provider_id, start, end, exclude_token=None):
+        return []
+
+
+def store_from_env() -> HoldStore:
+    redis_url = os.getenv("HOLDS_REDIS_URL")
+    if redis_url:
+        return RedisHoldStore(redis_url)
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        print(
+            f"WARNING: {workers} workers and no HOLDS_REDIS_URL: slot holds are disabled "
+            "(POST /api/public/holds answers 503). Set HOLDS_REDIS_URL or run one worker."
+        )
+        return DisabledHoldStore()
+    return MemoryHoldStore()
+
+
+slot_holds = store_from_env()
@@ -0,0 +1,50 @@
+import hashlib
+import os
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from .responses import FastJSONResponse
+
+# Route cache policies (overridable per deployment)
+# Profiles change rarely: let browsers/CDNs keep them and revalidate with the ETag
+PROFILE_CACHE_CONTROL = os.getenv("PROFILE_CACHE_CONTROL", "public, max-age=3600, stale-while-revalidate=86400")
+# Slots change with every booking: short freshness, serve stale while refetching
+SLOTS_CACHE_CONTROL = os.getenv("SLOTS_CACHE_CONTROL", "public, max-age=30, stale-while-revalidate=60")
+
+# Compression (responses smaller than this are sent as-is)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    # Compression middleware or proxies may turn our strong tag into a weak one
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def cached_json_response(request: Request, content: Any, cache_control: str) -> Response:
+    """Render JSON once, tag it, and answer 304 when the client already has it."""
+    response = FastJSONResponse(content)
+    etag = make_etag(response.body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
+def add_compression(app):
+    """Brotli when brotli-asgi is installed (with gzip fallback), plain gzip otherwise."""
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        from fastapi.middleware.gzip import GZipMiddleware
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+        return
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
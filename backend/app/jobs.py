@@ -0,0 +1,108 @@
+import asyncio
+import os
+import zlib
+from typing import Callable, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from .database import DATABASE_URL, engine
+from .refresh_tokens import purge_expired_refresh_tokens
+
+# Periodic jobs are scheduled in every worker process, but only one worker,
+# the leader, runs them. Leadership is a session-level Postgres advisory lock
+# held on a dedicated connection for as long as the worker lives; the others
+# retry every tick and take over once the leader's connection goes away
+# (worker recycled, crashed or shut down).
+
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+JOBS_INTERVAL_SECONDS = float(os.getenv("JOBS_INTERVAL_SECONDS", "60"))
+LEADER_LOCK_NAME = "workslot_jobs_leader"
+
+
+def lock_key(name: str) -> int:
+    # Stable across processes and deploys (unlike hash())
+    return zlib.crc32(name.encode("utf-8"))
+
+
+class JobLeader:
+    """Holds (or tries to win) the leader advisory lock on a connection outside the request pool."""
+
+    def __init__(self, name: str = LEADER_LOCK_NAME):
+        self.key = lock_key(name)
+        self._engine = create_engine(DATABASE_URL, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+        self._conn: Optional[Connection] = None
+
+    def ensure(self) -> bool:
+        """True if this worker is the leader, trying to become it if not."""
+        if self._conn is not None:
+            try:
+                # The lock lives exactly as long as this connection
+                self._conn.execute(text("SELECT 1"))
+                return True
+            except Exception as e:
+                print(f"Jobs: lost leader connection: {e}")
+                self.release()
+        conn = self._engine.connect()
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        print(f"Jobs: worker {os.getpid()} is now running periodic jobs")
+        self._conn = conn
+        return True
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()  # Closing the session drops the lock
+            except Exception:
+                pass
+            self._conn = None
+
+
+def run_job(job: Callable[[Session], None]):
+    with Session(engine) as session:
+        job(session)
+        session.commit()
+
+
+JOBS = [
+    ("purge_expired_refresh_tokens", purge_expired_refresh_tokens),
+]
+
+
+async def _run_as_leader(leader: JobLeader, interval: float):
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await run_in_threadpool(leader.ensure):
+                    continue
+            except Exception as e:
+                print(f"Jobs: leader election failed: {e}")
+                continue
+            for name, job in JOBS:
+                try:
+                    await run_in_threadpool(run_job, job)
+                except Exception as e:
+                    print(f"Jobs: {name} failed: {e}")
+    finally:
+        leader.release()
+
+
+def start_jobs() -> List[asyncio.Task]:
+    if not JOBS_ENABLED:
+        return []
+    if engine.dialect.name != "postgresql":
+        # Leader election relies on Postgres advisory locks
+        print(f"Jobs: disabled on {engine.dialect.name}, they need PostgreSQL")
+        return []
+    return [asyncio.create_task(_run_as_leader(JobLeader(), JOBS_INTERVAL_SECONDS))]
@@ -1,21 +1,35 @@
 from datetime import datetime, timedelta, date, time
-from typing import List
-from fastapi import FastAPI, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 from contextlib import asynccontextmanager
-from .database import init_db, engine
-from .models import User, UserRead, AccessRequest, AccessRequestCreate, AccessRequestRead, Profile, ProfileCreate, ProfileRead
-from .auth import verify_password, create_access_token, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
-from .deps import get_session, get_current_admin, get_current_user
+from .database import check_migrations, engine
+from .models import User, UserRead, AccessRequest, AccessRequestCreate, AccessRequestRead, AccessRequestReview, Profile, ProfileCreate, ProfileRead, RefreshRequest
+from .calendar_feed import calendar_cache
+from .slugs import slugify, insert_profile, slug_taken
+from .tz import is_valid_timezone
+from .jobs import start_jobs
+from .auth import verify_password, create_access_token, decode_token, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
+from .deps import get_session, get_current_admin, get_current_user, oauth2_scheme
+from .access_requests import submit_access_request, list_access_requests, review_access_requests, REVIEW_ACTIONS, PAGE_SIZE as ACCESS_REQUEST_PAGE_SIZE
+from .refresh_tokens import new_family_id, issue_refresh_token, rotate_refresh_token, revoke_token_family, revoke_user_tokens
+from .ratelimit import AdmissionControlMiddleware
+from .query_counter import install as install_query_counter, QueryCountMiddleware, QUERY_DEBUG
+from .profiling import ProfilingMiddleware, PROFILING_ENABLED, profile_store, collapsed
+from .http_cache import add_compression, cached_json_response, PROFILE_CACHE_CONTROL, SLOTS_CACHE_CONTROL
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # On startup
-    init_db()
+    # On startup: one query against alembic_version instead of create_all + reflection
+    check_migrations()
+    jobs = start_jobs()
     yield
     # On shutdown
+    for job in jobs:
+        job.cancel()
 
 app = FastAPI(title="WorkSlot V1", lifespan=lifespan)
 
@@ -30,6 +44,9 @@ frontend_url = os.getenv("FRONTEND_URL")
 if frontend_url:
     origins.append(frontend_url)
 
+# Admission control for public endpoints (inside CORS so 429/503 stay readable by the browser)
+app.add_middleware(AdmissionControlMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins, 
@@ -38,6 +55,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression (gzip/brotli above a size threshold)
+add_compression(app)
+
+# Statement counting per request; header/logging only in QUERY_DEBUG mode
+install_query_counter(engine)
+if QUERY_DEBUG:
+    app.add_middleware(QueryCountMiddleware)
+
+# Opt-in request profiling (outermost, so it sees the whole request)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# --- Health ---
+from .health import readiness
+
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the process is up and serving, never touches the database
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz(response: Response):
+    result = readiness()
+    if not result["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
+
 @app.post("/api/login")
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
     user = session.exec(select(User).where(User.email == form_data.username)).first()
@@ -49,30 +93,75 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         )
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-        
+
+    # The only Argon2 check per login; later renewals go through /api/token/refresh
+    family_id = new_family_id()
+    refresh_token = issue_refresh_token(session, user.id, family_id)
+    session.commit()
+    return _token_response(user, family_id, refresh_token)
+
+def _token_response(user: User, family_id: str, refresh_token: str):
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        # "fam" ties the access token to its login, so a password change can keep this session
+        data={"sub": user.email, "fam": family_id}, expires_delta=access_token_expires
     )
     return {
         "access_token": access_token, 
+        "refresh_token": refresh_token,
         "token_type": "bearer",
         "is_admin": user.is_admin,
         "onboarding_completed": user.onboarding_completed
     }
 
-@app.post("/api/access-requests", response_model=AccessRequestRead)
-async def create_access_request(request: AccessRequestCreate, session: Session = Depends(get_session)):
-    db_request = AccessRequest.model_validate(request)
-    session.add(db_request)
+@app.post("/api/token/refresh")
+async def refresh_access_token(request: RefreshRequest, session: Session = Depends(get_session)):
+    # Signature check + one UPDATE on the jti index; no password hashing
+    rotated = rotate_refresh_token(session, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token, family_id = rotated
+    return _token_response(user, family_id, refresh_token)
+
+@app.post("/api/logout")
+async def logout(request: RefreshRequest, session: Session = Depends(get_session)):
+    revoke_token_family(session, request.refresh_token)
     session.commit()
-    session.refresh(db_request)
-    return db_request
+    return {"status": "success"}
+
+@app.post("/api/access-requests")
+async def create_access_request(request: AccessRequestCreate, session: Session = Depends(get_session)):
+    # Deduplicated on normalized email. Same answer for new and repeated
+    # submissions: anyone can post any email, so nothing about an existing request is returned
+    submit_access_request(session, request)
+    return {"status": "received"}
 
 @app.get("/api/admin/access-requests", response_model=List[AccessRequestRead])
-async def read_access_requests(session: Session = Depends(get_session), admin: User = Depends(get_current_admin)):
-    requests = session.exec(select(AccessRequest).order_by(AccessRequest.created_at.desc())).all()
-    return requests
+async def read_access_requests(
+    status: Optional[str] = "pending",
+    limit: int = ACCESS_REQUEST_PAGE_SIZE,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    session: Session = Depends(get_session),
+    admin: User = Depends(get_current_admin),
+):
+    # status=all lists every request; pages continue from the last row's created_at/id
+    return list_access_requests(session, None if status == "all" else status, limit, before, before_id)
+
+@app.post("/api/admin/access-requests/review")
+async def review_access_request_batch(review: AccessRequestReview, session: Session = Depends(get_session), admin: User = Depends(get_current_admin)):
+    if review.action not in REVIEW_ACTIONS:
+        raise HTTPException(status_code=400, detail="Invalid action")
+    if not review.ids:
+        raise HTTPException(status_code=400, detail="No requests selected")
+    # Password hashing for approvals runs off the event loop
+    result = await run_in_threadpool(review_access_requests, session, review.ids, review.action)
+    print(f"REVIEWED ACCESS REQUESTS: {result['reviewed']} {result['status']}, {result['created']} users created")
+    return result
 
 @app.get("/api/admin/users", response_model=List[UserRead])
 async def read_users(session: Session = Depends(get_session), admin: User = Depends(get_current_admin)):
@@ -100,24 +189,60 @@ async def create_user_manual(email: str, session: Session = Depends(get_session)
         is_active=True
     )
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    session.flush() # INSERT ... RETURNING id, same transaction as the profile
     
-    # Auto-create empty profile
-    base_slug = email.split("@")[0].lower().replace(".", "-")
-    profile = Profile(
-        user_id=new_user.id,
-        business_name="New Business", # Placeholder
-        business_category="Uncategorized",
-        service_area="Remote",
-        slug=f"{base_slug}-{new_user.id}"
-    )
-    session.add(profile)
+    # Auto-create empty profile (slug picked up front, no retry round trip)
+    insert_profile(session, {
+        "user_id": new_user.id,
+        "business_name": "New Business", # Placeholder
+        "business_category": "Uncategorized",
+        "service_area": "Remote",
+        "availability_config": {},
+        "booking_rules": {},
+    }, slugify(email.split("@")[0]))
+    result = UserRead.model_validate(new_user)
     session.commit()
     
     # TODO: In production this would send email. For V1 we return it or just console log it.
     print(f"CREATED USER: {email} / {temp_password}") 
-    return new_user
+    return result
+
+from fastapi import UploadFile, File
+from starlette.concurrency import run_in_threadpool
+from .bulk_import import ImportReport, import_providers, read_rows, format_for
+import io
+
+@app.post("/api/admin/users/import")
+async def import_users(file: UploadFile = File(...), session: Session = Depends(get_session), admin: User = Depends(get_current_admin)):
+    # CSV or NDJSON, streamed from the spooled upload; hashing/inserts run off the event loop
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    report = ImportReport()
+    try:
+        rows = read_rows(stream, format_for(file.filename or ""))
+        await run_in_threadpool(import_providers, session, rows, report=report)
+    except Exception as e:
+        # Always answer with the report: it holds the only copy of generated passwords
+        report.errors.append({"row": report.processed, "error": f"Import stopped: {e}"})
+        print(f"IMPORT: stopped after {report.processed} rows: {e}")
+    finally:
+        stream.detach()
+    print(f"IMPORTED USERS: {report.created} created, {report.skipped} skipped ({report.rows_per_second:.0f} rows/s)")
+    return report.as_dict()
+
+@app.get("/api/admin/profiles")
+async def list_request_profiles(admin: User = Depends(get_current_admin)):
+    # Profiles live in the worker that served the request (see app.profiling)
+    return {"enabled": PROFILING_ENABLED, "pid": os.getpid(), "profiles": profile_store.summaries()}
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def download_request_profile(profile_id: int, format: str = "json", admin: User = Depends(get_current_admin)):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found (profiles are kept per worker process)")
+    if format == "collapsed":
+        # For flamegraph.pl / speedscope
+        return Response(collapsed(profile), media_type="text/plain", headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.txt"'})
+    return FastJSONResponse(profile, headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.json"'})
 
 @app.put("/api/admin/users/{user_id}/status")
 async def toggle_user_status(user_id: int, active: bool, session: Session = Depends(get_session), admin: User = Depends(get_current_admin)):
@@ -126,13 +251,17 @@ async def toggle_user_status(user_id: int, active: bool, session: Session = Depe
         raise HTTPException(status_code=404, detail="User not found")
     user.is_active = active
     session.add(user)
+    if not active:
+        revoke_user_tokens(session, user.id)
     session.commit()
-    return {"status": "success", "is_active": user.is_active}
+    return {"status": "success", "is_active": active}
 
 @app.post("/api/onboarding", response_model=ProfileRead)
 async def complete_onboarding(profile_data: ProfileCreate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
     if current_user.onboarding_completed:
         raise HTTPException(status_code=400, detail="Onboarding already completed")
+    if profile_data.timezone and not is_valid_timezone(profile_data.timezone):
+        raise HTTPException(status_code=400, detail="Unknown time zone")
     
     # Update Password if provided
     if profile_data.new_password:
@@ -140,29 +269,20 @@ async def complete_onboarding(profile_data: ProfileCreate, session: Session = De
         session.add(current_user)
 
     # Create Profile (exclude inputs that aren't in Profile model)
-    profile_dict = profile_data.model_dump(exclude={"new_password"})
-    
-    # Generate Slug if missing
-    if not profile_dict.get("slug"):
-        base_slug = profile_dict["business_name"].lower().replace(" ", "-")
-        # specific uniqueness check could be here, for V1 just appending ID
-        profile_dict["slug"] = f"{base_slug}-{current_user.id}"
-
-    # Inject user_id for validation
+    profile_dict = profile_data.model_dump(exclude={"new_password", "slug"})
     profile_dict["user_id"] = current_user.id
 
-    db_profile = Profile.model_validate(profile_dict)
-    # db_profile.user_id = current_user.id # Already in dict
-    
-    session.add(db_profile)
+    # Requested slug or business name, suffixed if already taken
+    base_slug = slugify(profile_data.slug or profile_data.business_name)
+    profile_id, slug = insert_profile(session, profile_dict, base_slug)
     
     # Mark Complete
     current_user.onboarding_completed = True
     session.add(current_user)
     
+    result = ProfileRead(**profile_dict, id=profile_id, slug=slug)
     session.commit()
-    session.refresh(db_profile)
-    return db_profile
+    return result
 
 @app.get("/api/profile", response_model=ProfileRead)
 async def get_profile(session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
@@ -173,12 +293,28 @@ async def get_profile(session: Session = Depends(get_session), current_user: Use
 
 from .models import ProfileUpdate
 @app.patch("/api/profile", response_model=ProfileRead)
-async def update_profile(profile_data: ProfileUpdate, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+async def update_profile(profile_data: ProfileUpdate, token: str = Depends(oauth2_scheme), session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
     profile = session.exec(select(Profile).where(Profile.user_id == current_user.id)).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
         
     profile_data_dict = profile_data.model_dump(exclude_unset=True)
+    if profile_data_dict.get("timezone") and not is_valid_timezone(profile_data_dict["timezone"]):
+        raise HTTPException(status_code=400, detail="Unknown time zone")
+    if "timezone" in profile_data_dict and not profile_data_dict["timezone"]:
+        if profile.timezone:
+            raise HTTPException(status_code=400, detail="Time zone can be changed but not removed")
+        profile_data_dict.pop("timezone")
+    elif profile_data_dict.get("timezone") and not profile.timezone:
+        # First zone for this provider: its bookings so far are wall-clock
+        # times, convert them to UTC in that zone
+        session.execute(
+            text(
+                "UPDATE booking SET start_time = (start_time AT TIME ZONE :tz) AT TIME ZONE 'UTC', "
+                "end_time = (end_time AT TIME ZONE :tz) AT TIME ZONE 'UTC' WHERE provider_id = :provider_id"
+            ),
+            {"tz": profile_data_dict["timezone"], "provider_id": current_user.id},
+        )
     
     # Handle Password Update
     if "new_password" in profile_data_dict:
@@ -186,86 +322,213 @@ async def update_profile(profile_data: ProfileUpdate, session: Session = Depends
         if new_pwd:
              current_user.hashed_password = get_password_hash(new_pwd)
              session.add(current_user)
+             # Sign out other sessions; this one keeps its refresh token
+             revoke_user_tokens(session, current_user.id, keep_family=(decode_token(token) or {}).get("fam"))
+
+    # Slug changes are explicit here: normalize, and refuse one that's taken
+    slug_changed = False
+    if "slug" in profile_data_dict:
+        new_slug = slugify(profile_data_dict.pop("slug"), fallback=profile.slug)
+        if new_slug != profile.slug:
+            if slug_taken(session, new_slug, exclude_profile_id=profile.id):
+                raise HTTPException(status_code=409, detail="This booking link is already taken")
+            profile.slug = new_slug
+            slug_changed = True
 
     for key, value in profile_data_dict.items():
         setattr(profile, key, value)
         
     session.add(profile)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        # Claimed by someone else between the check above and this commit
+        session.rollback()
+        if slug_changed:
+            raise HTTPException(status_code=409, detail="This booking link is already taken")
+        raise
     session.refresh(profile)
+    
+    # Calendar name follows the business name (and event times the time zone)
+    calendar_cache.invalidate_provider(current_user.id)
     return profile
 
 from datetime import date
 from .models import Booking, BookingCreate, BookingRead, Profile
-from .utils import generate_slots
+from .utils import generate_slots, slots_to_json, bookings_to_json
+from .responses import FastJSONResponse, UTCJSONResponse
 
 # ... existing code ...
 
 @app.get("/api/public/provider/{slug}", response_model=ProfileRead)
-async def get_public_provider(slug: str, session: Session = Depends(get_session)):
+async def get_public_provider(slug: str, request: Request, session: Session = Depends(get_session)):
     profile = session.exec(select(Profile).where(Profile.slug == slug)).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Provider not found")
-    return profile
+    content = ProfileRead.model_validate(profile).model_dump(mode="json")
+    return cached_json_response(request, content, PROFILE_CACHE_CONTROL)
 
-@app.get("/api/public/provider/{slug}/slots")
-async def get_provider_slots(slug: str, date_str: str, session: Session = Depends(get_session)):
-    # 1. Get Profile
-    profile = session.exec(select(Profile).where(Profile.slug == slug)).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="Provider not found")
-        
-    # 2. Parse Date
+@app.get("/api/public/provider/{slug}/slots", response_class=FastJSONResponse)
+async def get_provider_slots(slug: str, date_str: str, request: Request, hold_token: Optional[str] = None, session: Session = Depends(get_session)):
+    # 1. Parse Date
     try:
         target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format (YYYY-MM-DD)")
+
+    # 2. Get Profile
+    profile = session.exec(select(Profile).where(Profile.slug == slug)).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Provider not found")
+
+    # 3. Booking Rules: dates outside the horizon never reach the bookings query
+    rules = compile_rules(profile.booking_rules)
+    tz_name = zone_name(profile.timezone)
+    now = datetime.utcnow()
+    if not rules.allows_date(target_date, to_local(tz_name, now).date()):
+        return cached_json_response(request, [], SLOTS_CACHE_CONTROL)
         
-    # 3. Get Bookings for Date
-    # Filter bookings that overlap with this day (simple approach: start_time on same day)
-    # Using python filtering for MVP simplicity or proper SQL filter
-    # Let's use SQL filter for start_time range
-    day_start = datetime.combine(target_date, time.min)
-    day_end = datetime.combine(target_date, time.max)
+    # 4. Get Bookings for Date
+    # Filter bookings starting on this (provider-local) day; stored times are UTC
+    day_start, day_end = local_day_bounds(tz_name, target_date)
     
     bookings = session.exec(
         select(Booking)
         .where(Booking.provider_id == profile.user_id)
         .where(Booking.start_time >= day_start)
-        .where(Booking.start_time <= day_end)
+        .where(Booking.start_time < day_end)
+        .where(Booking.status.not_in(ACTIVE_EXCLUDED_STATUSES))
     ).all()
+
+    # Daily cap: rows are already loaded for the overlap check, no extra query
+    if rules.day_is_full(len(bookings)):
+        return cached_json_response(request, [], SLOTS_CACHE_CONTROL)
     
-    # 4. Generate
-    slots = generate_slots(target_date, profile.availability_config, bookings)
-    return slots
+    # 5. Generate (slots held by other customers are left out; the caller's own hold stays visible)
+    held = await slot_holds.held(profile.user_id, day_start, day_end, exclude_token=hold_token)
+    slots = generate_slots(target_date, profile.availability_config, bookings, earliest_start=rules.earliest_start(now), tz_name=tz_name, held=held)
+    return cached_json_response(request, slots_to_json(slots), SLOTS_CACHE_CONTROL)
 
 from fastapi import BackgroundTasks
 from .email import email_service
 
 # ... existing imports ...
 
-from sqlalchemy import text
+from sqlalchemy import text, func, and_, or_
+from .rules import compile_rules, ACTIVE_EXCLUDED_STATUSES
+from .schedule import compile_schedule
+from .tz import zone_name, to_local, to_utc_naive, local_day_bounds
+from .holds import slot_holds, TooManyHolds, HoldsUnavailable
+from .ratelimit import client_ip
+from .models import HoldCreate, HoldRead
+
+def _validate_slot(profile: Profile, start: datetime, end: datetime, now: datetime):
+    """
+    Shared by holds and bookings: returns (start, end) as naive UTC, the local
+    start and the compiled rules, or raises 400 if this isn't a bookable slot.
+    """
+    # Times are stored as UTC; naive input is read as the provider's local time
+    tz_name = zone_name(profile.timezone)
+    start_time = to_utc_naive(tz_name, start)
+    end_time = to_utc_naive(tz_name, end)
+    if start_time is None or end_time is None:
+        raise HTTPException(status_code=400, detail="Requested time does not exist in the provider's time zone")
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="Booking must end after it starts")
+    local_start = to_local(tz_name, start_time)
+
+    # Must be one of the provider's generated slots (set lookup on the compiled schedule)
+    if not compile_schedule(profile.availability_config).matches(local_start, to_local(tz_name, end_time)):
+        raise HTTPException(status_code=400, detail="Requested time is not an available slot")
+
+    # Booking Rules (same compiled rules as slot generation)
+    rules = compile_rules(profile.booking_rules)
+    if start_time < rules.earliest_start(now):
+        detail = f"Bookings need at least {rules.min_notice} minutes notice" if rules.min_notice else "Slot has already started"
+        raise HTTPException(status_code=400, detail=detail)
+    if not rules.allows_date(local_start.date(), to_local(tz_name, now).date()):
+        raise HTTPException(status_code=400, detail="Booking date is outside the booking window")
+    return start_time, end_time, local_start, rules
+
+@app.post("/api/public/holds", response_model=HoldRead, response_class=UTCJSONResponse)
+async def create_hold(hold_data: HoldCreate, request: Request, session: Session = Depends(get_session)):
+    # Read-only: the hold itself never touches the database
+    profile = session.exec(select(Profile).where(Profile.user_id == hold_data.provider_id)).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Provider not found")
+    start_time, end_time, _, _ = _validate_slot(profile, hold_data.start_time, hold_data.end_time, datetime.utcnow())
+
+    booked = session.exec(
+        select(func.count())
+        .where(Booking.provider_id == hold_data.provider_id)
+        .where(Booking.status.not_in(ACTIVE_EXCLUDED_STATUSES))
+        .where(Booking.start_time < end_time)
+        .where(Booking.end_time > start_time)
+    ).one()
+    if booked:
+        raise HTTPException(status_code=409, detail="Slot no longer available")
+
+    try:
+        hold = await slot_holds.acquire(hold_data.provider_id, start_time, end_time, client_ip(request.scope), replace_token=hold_data.replace_token)
+    except TooManyHolds:
+        raise HTTPException(status_code=429, detail="Too many slots held at once, finish or release one first")
+    except HoldsUnavailable:
+        raise HTTPException(status_code=503, detail="Slot holds are not available")
+    if hold is None:
+        raise HTTPException(status_code=409, detail="Slot is being booked by someone else")
+    # Providers without a zone work in wall-clock times: no UTC marker
+    response_class = UTCJSONResponse if profile.timezone else FastJSONResponse
+    return response_class({
+        "token": hold.token,
+        "provider_id": hold.provider_id,
+        "start_time": hold.start,
+        "end_time": hold.end,
+        "expires_at": hold.expires_at,
+    })
+
+@app.delete("/api/public/holds/{token}")
+async def release_hold(token: str):
+    released = await slot_holds.release(token)
+    return {"status": "success", "released": released}
 
 @app.post("/api/public/bookings", response_model=BookingRead)
 async def create_booking(booking_data: BookingCreate, background_tasks: BackgroundTasks, session: Session = Depends(get_session)):
     import os
     
-    # Verify Provider
-    provider = session.exec(select(User).where(User.id == booking_data.provider_id)).first()
-    if not provider:
+    # Verify Provider (profile carries the booking rules)
+    row = session.exec(
+        select(User, Profile)
+        .join(Profile, Profile.user_id == User.id)
+        .where(User.id == booking_data.provider_id)
+    ).first()
+    if not row:
          raise HTTPException(status_code=404, detail="Provider not found")
+    provider, profile = row
+
+    now = datetime.utcnow()
+    start_time, end_time, local_start, rules = _validate_slot(profile, booking_data.start_time, booking_data.end_time, now)
+
+    # Someone else's hold wins; settled in memory/Redis before the transaction does any work
+    if await slot_holds.held(profile.user_id, start_time, end_time, exclude_token=booking_data.hold_token):
+        raise HTTPException(status_code=409, detail="Slot is being booked by someone else")
     
-    # Verify Slot Availability
-    collision = session.exec(
-        select(Booking)
+    # Verify Slot Availability + daily cap in one round trip:
+    # COUNTs over the (provider_id, start_time) index instead of loading rows
+    tz_name = zone_name(profile.timezone)
+    day_start, day_end = local_day_bounds(tz_name, local_start.date())
+    overlaps = and_(Booking.start_time < end_time, Booking.end_time > start_time)
+    on_day = and_(Booking.start_time >= day_start, Booking.start_time < day_end)
+    collisions, booked_today = session.exec(
+        select(func.count().filter(overlaps), func.count().filter(on_day))
         .where(Booking.provider_id == booking_data.provider_id)
-        .where(Booking.start_time < booking_data.end_time)
-        .where(Booking.end_time > booking_data.start_time)
-        .where(Booking.status.not_in(["declined", "expired"]))
-    ).first()
+        .where(Booking.status.not_in(ACTIVE_EXCLUDED_STATUSES))
+        .where(or_(overlaps, on_day))
+    ).one()
     
-    if collision:
+    if collisions:
         raise HTTPException(status_code=409, detail="Slot no longer available")
+    if rules.day_is_full(booked_today):
+        raise HTTPException(status_code=409, detail="No more bookings available on this day")
 
     # Create Booking
     db_booking = Booking(
@@ -273,30 +536,87 @@ async def create_booking(booking_data: BookingCreate, background_tasks: Backgrou
         customer_email=booking_data.customer_email,
         customer_name=booking_data.customer_name,
         customer_comment=booking_data.customer_comment,
-        start_time=booking_data.start_time,
-        end_time=booking_data.end_time,
+        start_time=start_time,
+        end_time=end_time,
         status="pending",
-        created_at=datetime.utcnow(),
-        hold_expires_at=datetime.utcnow() + timedelta(minutes=30)
+        created_at=now,
+        hold_expires_at=now + timedelta(minutes=rules.hold_duration)
     )
     
     session.add(db_booking)
+    session.flush()
+    # Snapshot before commit: reading expired attributes afterwards costs a SELECT each
+    result = BookingRead.model_validate(db_booking)
+    provider_email = provider.email
     session.commit()
-    session.refresh(db_booking)
+    calendar_cache.apply_booking(result)
+    if booking_data.hold_token:
+        await slot_holds.release(booking_data.hold_token)
     
     # Notify Provider
     dashboard_link = f"{os.getenv('FRONTEND_URL', 'http://localhost:5173')}/dashboard"
-    background_tasks.add_task(email_service.send_provider_notification, provider.email, db_booking.customer_name, dashboard_link)
+    background_tasks.add_task(email_service.send_provider_notification, provider_email, result.customer_name, dashboard_link)
     
-    return db_booking
+    return result
 
 
 # ...
 
-@app.get("/api/provider/bookings", response_model=List[BookingRead])
+BOOKING_READ_FIELDS = list(BookingRead.model_fields)
+
+@app.get("/api/provider/bookings", response_model=List[BookingRead], response_class=UTCJSONResponse)
 async def get_provider_bookings(session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
-    bookings = session.exec(select(Booking).where(Booking.provider_id == current_user.id).order_by(Booking.created_at.desc())).all()
-    return bookings
+    # Plain column tuples: no ORM instances and no response_model revalidation per row
+    columns = [Booking.__table__.c[field] for field in BOOKING_READ_FIELDS]
+    rows = session.exec(
+        select(*columns, Profile.timezone)
+        .outerjoin(Profile, Profile.user_id == Booking.provider_id)
+        .where(Booking.provider_id == current_user.id)
+        .order_by(Booking.created_at.desc())
+    ).all()
+    # Times are UTC once the provider has a zone; before that they are wall-clock times
+    response_class = UTCJSONResponse if rows and rows[0][-1] else FastJSONResponse
+    return response_class(bookings_to_json([row[:-1] for row in rows], BOOKING_READ_FIELDS))
+
+from sqlalchemy import BigInteger, cast
+
+@app.get("/api/provider/analytics/heatmap")
+async def get_availability_heatmap(weeks: Optional[int] = None, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    # Imported here: analytics pulls in numpy, which only this endpoint needs
+    from .analytics import availability_heatmap, DEFAULT_WEEKS, MAX_WEEKS
+
+    if weeks is None:
+        weeks = DEFAULT_WEEKS
+    if not 1 <= weeks <= MAX_WEEKS:
+        raise HTTPException(status_code=400, detail=f"weeks must be between 1 and {MAX_WEEKS}")
+
+    profile = session.exec(select(Profile).where(Profile.user_id == current_user.id)).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    # Last `weeks` whole weeks of local days, ending today
+    tz_name = zone_name(profile.timezone)
+    today = to_local(tz_name, datetime.utcnow()).date()
+    first_day = today - timedelta(days=weeks * 7 - 1)
+    window_start, _ = local_day_bounds(tz_name, first_day)
+    _, window_end = local_day_bounds(tz_name, today)
+
+    # One query for the whole window; epoch seconds convert to an array without per-row datetime work
+    rows = session.exec(
+        select(
+            cast(func.extract("epoch", Booking.start_time), BigInteger),
+            cast(func.extract("epoch", Booking.end_time), BigInteger),
+        )
+        .where(Booking.provider_id == current_user.id)
+        .where(Booking.start_time < window_end)
+        .where(Booking.end_time > window_start)
+        .where(Booking.status.not_in(ACTIVE_EXCLUDED_STATUSES))
+    ).all()
+
+    result = await run_in_threadpool(
+        availability_heatmap, compile_schedule(profile.availability_config), tz_name, first_day, weeks, rows
+    )
+    return FastJSONResponse(result)
 
 from .models import BookingStatusUpdate, BookingRead
 
@@ -305,9 +625,16 @@ async def update_booking_status(booking_id: int, update_data: BookingStatusUpdat
     if update_data.status not in ["confirmed", "declined"]:
          raise HTTPException(status_code=400, detail="Invalid status")
          
-    booking = session.get(Booking, booking_id)
-    if not booking or booking.provider_id != current_user.id:
+    # Booking + business name (for the email) in one query
+    row = session.exec(
+        select(Booking, Profile.business_name)
+        .outerjoin(Profile, Profile.user_id == Booking.provider_id)
+        .where(Booking.id == booking_id)
+        .where(Booking.provider_id == current_user.id)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Booking not found")
+    booking, business_name = row
         
     if booking.status == "expired":
         raise HTTPException(status_code=400, detail="Cannot update expired booking")
@@ -317,17 +644,66 @@ async def update_booking_status(booking_id: int, update_data: BookingStatusUpdat
         booking.provider_comment = update_data.provider_comment
         
     session.add(booking)
+    session.flush()
+    result = BookingRead.model_validate(booking)
     session.commit()
-    session.refresh(booking)
+    calendar_cache.apply_booking(result)
     
     # Notify Customer
-    provider_profile = session.exec(select(Profile).where(Profile.user_id == current_user.id)).first()
-    business_name = provider_profile.business_name if provider_profile else "Provider"
-    
-    background_tasks.add_task(email_service.send_customer_update, booking.customer_email, booking.status, business_name, booking.provider_comment)
+    background_tasks.add_task(email_service.send_customer_update, result.customer_email, result.status, business_name or "Provider", result.provider_comment)
     
-    return {"status": "success", "booking_status": booking.status}
-    
-    return booking
+    return {"status": "success", "booking_status": result.status}
 
  
+
+# --- Calendar Feed ---
+import secrets
+
+def _calendar_feed_response(request: Request, token: str) -> dict:
+    return {"token": token, "url": str(request.url_for("get_calendar_feed", token=token))}
+
+@app.get("/api/provider/calendar")
+async def get_calendar_settings(request: Request, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    profile = session.exec(select(Profile).where(Profile.user_id == current_user.id)).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if not profile.calendar_token:
+        profile.calendar_token = secrets.token_urlsafe(24)
+        session.add(profile)
+        session.commit()
+    return _calendar_feed_response(request, profile.calendar_token)
+
+@app.post("/api/provider/calendar/rotate")
+async def rotate_calendar_token(request: Request, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+    profile = session.exec(select(Profile).where(Profile.user_id == current_user.id)).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    profile.calendar_token = secrets.token_urlsafe(24)
+    session.add(profile)
+    session.commit()
+    # This worker stops serving the old URL right away. Other workers keep their
+    # cached copy of the old feed until it is CALENDAR_CACHE_TTL seconds old
+    # (5 minutes by default): caches are per process and nothing tells them
+    # about the rotation.
+    calendar_cache.invalidate_provider(current_user.id)
+    return _calendar_feed_response(request, profile.calendar_token)
+
+@app.get("/api/calendar/{token}.ics")
+async def get_calendar_feed(token: str, request: Request):
+    # Served from cache whenever possible, so no session dependency here
+    feed = calendar_cache.get(token)
+    if feed is None:
+        with Session(engine) as session:
+            profile = session.exec(select(Profile).where(Profile.calendar_token == token)).first()
+            if not profile:
+                raise HTTPException(status_code=404, detail="Calendar not found")
+            bookings = session.exec(
+                select(Booking)
+                .where(Booking.provider_id == profile.user_id)
+                .where(Booking.status == "confirmed")
+            ).all()
+            feed = calendar_cache.store(token, profile.user_id, profile.business_name, bookings, utc=bool(profile.timezone))
+
+    if feed.not_modified(request.headers):
+        return Response(status_code=304, headers=feed.headers)
+    return Response(content=feed.body, media_type="text/calendar; charset=utf-8", headers=feed.headers)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, Index, text
 
 # User Models
 class UserBase(SQLModel):
@@ -24,6 +24,18 @@ class UserCreate(UserBase):
 class UserRead(UserBase):
     id: int
 
+# Refresh Tokens (only the jti is stored; the token itself is a signed JWT)
+class RefreshToken(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jti: str = Field(unique=True, index=True)
+    family_id: str = Field(index=True) # All tokens rotated from one login
+    user_id: int = Field(foreign_key="user.id", index=True)
+    expires_at: datetime = Field(index=True) # For the purge job
+    revoked_at: Optional[datetime] = None
+
+class RefreshRequest(SQLModel):
+    refresh_token: str
+
 # Access Request Models
 class AccessRequestBase(SQLModel):
     email: str
@@ -35,13 +47,26 @@ class AccessRequestBase(SQLModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class AccessRequest(AccessRequestBase, table=True):
+    __table_args__ = (
+        # Emails are stored normalized; at most one pending request per email
+        Index("ux_accessrequest_email_pending", "email", unique=True, postgresql_where=text("status = 'pending'")),
+        Index("ix_accessrequest_email_created_at", "email", "created_at"),  # Resubmission window
+        Index("ix_accessrequest_status_created_at", "status", "created_at", "id"),  # Admin review list
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    reviewed_at: Optional[datetime] = None
 
 class AccessRequestCreate(AccessRequestBase):
     pass
 
 class AccessRequestRead(AccessRequestBase):
     id: int
+    reviewed_at: Optional[datetime] = None
+
+class AccessRequestReview(SQLModel):
+    ids: List[int] = Field(max_length=500)
+    action: str # approve, reject
 
 # Profile Models
 class ProfileBase(SQLModel):
@@ -50,6 +75,7 @@ class ProfileBase(SQLModel):
     business_category: str
     service_area: str
     country: Optional[str] = None
+    timezone: Optional[str] = None # IANA name, e.g. "Europe/Berlin"; None: not set yet, booking times are wall-clock (read as UTC)
     slug: str = Field(index=True, unique=True)
     availability_config: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
     booking_rules: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
@@ -58,6 +84,8 @@ class Profile(ProfileBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     user: User = Relationship(back_populates="profile")
+    # Secret for the .ics feed URL, kept out of ProfileBase so it never shows up publicly
+    calendar_token: Optional[str] = Field(default=None, index=True, unique=True)
 
 class ProfileCreate(ProfileBase):
     new_password: str
@@ -68,6 +96,7 @@ class ProfileUpdate(SQLModel):
     business_category: Optional[str] = None
     service_area: Optional[str] = None
     country: Optional[str] = None
+    timezone: Optional[str] = None
     logo_url: Optional[str] = None
     slug: Optional[str] = None
     availability_config: Optional[Dict[str, Any]] = None
@@ -91,12 +120,30 @@ class BookingBase(SQLModel):
     hold_expires_at: Optional[datetime] = None
 
 class Booking(BookingBase, table=True):
+    # Day-range lookups (slots, daily caps) filter on provider + start_time
+    __table_args__ = (Index("ix_booking_provider_id_start_time", "provider_id", "start_time"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     provider_id: int = Field(foreign_key="user.id")
     provider: User = Relationship(back_populates="bookings")
 
 class BookingCreate(BookingBase):
     provider_id: int
+    hold_token: Optional[str] = None # From POST /api/public/holds, lets the holder book their own held slot
+
+# Slot holds (kept in app.holds, not in the database)
+class HoldCreate(SQLModel):
+    provider_id: int
+    start_time: datetime
+    end_time: datetime
+    replace_token: Optional[str] = None # Previous hold of the same customer, released on success
+
+class HoldRead(SQLModel):
+    token: str
+    provider_id: int
+    start_time: datetime
+    end_time: datetime
+    expires_at: datetime
 
 class BookingStatusUpdate(SQLModel):
     status: str
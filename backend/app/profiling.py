@@ -0,0 +1,242 @@
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from .auth import decode_token
+from .database import engine
+from .models import User
+from .query_counter import count_queries
+
+# Opt-in request profiling (PROFILING_ENABLED=true). A request is profiled when
+# an admin sends `X-Profile: 1`, or when it is picked by PROFILE_SAMPLE_RATE
+# and then turns out slower than PROFILE_SLOW_MS. While it runs, a sampler
+# thread records the Python stacks of every busy thread (the event loop and
+# the threadpool running sync routes/dependencies), and the query counter
+# times each SQL statement. Results go into a per-process ring buffer served
+# by the admin endpoints.
+#
+# Stacks are sampled process-wide: requests running concurrently in the same
+# worker show up too (`in_flight` in the profile says how many there were).
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+MAX_CONCURRENT_PROFILES = 2
+PROFILE_HEADER = b"x-profile"
+
+# Leaf frames in these files mean the thread is parked, not working
+IDLE_FILES = {"threading.py", "selectors.py", "queue.py", "runners.py"}
+
+
+class StackSampler:
+    """Samples sys._current_frames() every `interval` seconds on a daemon thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()  # "outer;...;inner" -> samples (collapsed/flamegraph format)
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({_short_path(code.co_filename)})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def _short_path(filename: str) -> str:
+    # Last two components: app/main.py, fastapi/routing.py
+    return "/".join(filename.replace(os.sep, "/").split("/")[-2:])
+
+
+def _top_functions(stacks: Counter, limit: int = 25) -> List[Dict[str, Any]]:
+    """Per function: samples where it was running (self) and on the stack at all (total)."""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for name in set(frames):
+            total[name] += count
+    return [
+        {"function": name, "self": own[name], "total": count}
+        for name, count in total.most_common(limit)
+    ]
+
+
+class ProfileStore:
+    """Bounded ring buffer of finished profiles (oldest dropped first)."""
+
+    def __init__(self, size: int = PROFILE_BUFFER_SIZE):
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def put(self, profile: Dict[str, Any]):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles)
+        keys = ("id", "method", "path", "status", "trigger", "started_at", "duration_ms", "query_count", "query_ms")
+        return [{key: profile[key] for key in keys} for profile in reversed(profiles)]
+
+    def get(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+
+profile_store = ProfileStore()
+
+
+def collapsed(profile: Dict[str, Any]) -> str:
+    """Stacks in the collapsed format read by flamegraph.pl / speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].items())
+
+
+def _is_admin(token: str) -> bool:
+    payload = decode_token(token)
+    if not payload or payload.get("typ") == "refresh" or not payload.get("sub"):
+        return False
+    with Session(engine) as session:
+        return bool(session.exec(select(User.is_admin).where(User.email == payload["sub"])).first())
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, store: ProfileStore = profile_store, sample_rate: float = PROFILE_SAMPLE_RATE, slow_ms: float = PROFILE_SLOW_MS):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.active = 0
+        self.in_flight = 0
+
+    async def _requested_by_admin(self, scope) -> bool:
+        if _header(scope, PROFILE_HEADER) not in ("1", "true"):
+            return False
+        authorization = _header(scope, b"authorization") or ""
+        if not authorization.lower().startswith("bearer "):
+            return False
+        # One indexed lookup, only for requests that ask to be profiled
+        return await run_in_threadpool(_is_admin, authorization[7:])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            trigger = None
+            if self.active < MAX_CONCURRENT_PROFILES:
+                if await self._requested_by_admin(scope):
+                    trigger = "header"
+                elif random.random() < self.sample_rate:
+                    trigger = "sampled"
+            if trigger is None:
+                await self.app(scope, receive, send)
+                return
+            await self._profile(scope, receive, send, trigger)
+        finally:
+            self.in_flight -= 1
+
+    async def _profile(self, scope, receive, send, trigger: str):
+        profile_id = self.store.next_id()
+        response = {"status": None, "first_byte_ms": None}
+        started_at = datetime.utcnow()
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["first_byte_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+                if trigger == "header":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", str(profile_id).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        self.active += 1
+        in_flight = self.in_flight
+        sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+        sampler.start()
+        try:
+            with count_queries() as stats:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            # The join can wait up to one sampling interval: keep it off the loop
+            await run_in_threadpool(sampler.stop)
+            self.active -= 1
+            duration_ms = (time.perf_counter() - t0) * 1000
+
+            if trigger == "header" or duration_ms >= self.slow_ms:
+                route = scope.get("route")
+                statements = sorted(stats.statements, key=lambda sql: stats.seconds.get(sql, 0.0), reverse=True)
+                self.store.put({
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": response["status"],
+                    "trigger": trigger,
+                    "started_at": started_at.isoformat() + "Z",
+                    "duration_ms": round(duration_ms, 2),
+                    "first_byte_ms": response["first_byte_ms"],
+                    "in_flight": in_flight,
+                    "query_count": stats.count,
+                    "query_ms": round(stats.total_seconds * 1000, 2),
+                    "queries": [
+                        {
+                            "sql": " ".join(sql.split()),
+                            "count": stats.statements[sql],
+                            "total_ms": round(stats.seconds.get(sql, 0.0) * 1000, 2),
+                            "max_ms": round(stats.slowest.get(sql, 0.0) * 1000, 2),
+                        }
+                        for sql in statements
+                    ],
+                    "samples": sampler.samples,
+                    "interval_ms": PROFILE_INTERVAL_MS,
+                    "top_functions": _top_functions(sampler.stacks),
+                    "stacks": dict(sampler.stacks),
+                })
@@ -0,0 +1,137 @@
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import event
+
+# Counts and times SQL statements per request (or per `count_queries()` block)
+# via engine hooks. Sync dependencies run in the threadpool with a copy of the
+# context, which still points at the same QueryStats object.
+
+QUERY_DEBUG = os.getenv("QUERY_DEBUG", "false").lower() == "true"
+
+# Expected upper bound of statements per route, including the auth user lookup.
+# Enforced by tests/test_query_budgets.py (query_budget) and logged by
+# QueryCountMiddleware in QUERY_DEBUG mode.
+QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    ("POST", "/api/login"): 2,
+    ("POST", "/api/token/refresh"): 3,
+    ("GET", "/api/public/provider/{slug}"): 1,
+    ("GET", "/api/public/provider/{slug}/slots"): 2,
+    ("POST", "/api/public/holds"): 2,
+    ("POST", "/api/public/bookings"): 3,
+    ("GET", "/api/provider/bookings"): 2,
+    ("PUT", "/api/provider/bookings/{booking_id}/status"): 3,
+    ("POST", "/api/admin/users"): 5,
+    ("POST", "/api/access-requests"): 2,
+    ("GET", "/api/provider/analytics/heatmap"): 3,
+}
+
+
+class QueryStats:
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent  # enclosing count_queries() block, which sees the same statements
+        self.count = 0
+        self.statements: Counter = Counter()
+        self.seconds: Dict[str, float] = defaultdict(float)  # time spent per statement
+        self.slowest: Dict[str, float] = {}
+
+    def record(self, statement: str):
+        self.count += 1
+        self.statements[statement] += 1
+        if self.parent is not None:
+            self.parent.record(statement)
+
+    def record_time(self, statement: str, elapsed: float):
+        self.seconds[statement] += elapsed
+        if elapsed > self.slowest.get(statement, 0.0):
+            self.slowest[statement] = elapsed
+        if self.parent is not None:
+            self.parent.record_time(statement, elapsed)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def repeated(self) -> Dict[str, int]:
+        """Identical statements executed more than once (typical N+1 signature)."""
+        return {sql: n for sql, n in self.statements.items() if n > 1}
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement)
+        conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.pop("query_started", None)
+    if stats is not None and started is not None:
+        stats.record_time(statement, time.perf_counter() - started)
+
+
+def install(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """For tests: fail when the block runs more than max_queries statements."""
+    with count_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {stats.count}. Repeated: {stats.repeated()}"
+        )
+
+
+class QueryCountMiddleware:
+    """
+    Debug mode (QUERY_DEBUG=true): adds X-Query-Count to responses, logs
+    repeated identical statements and routes that exceed their budget.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as stats:
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(stats.count).encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
+
+        route = scope.get("route")
+        path = getattr(route, "path", scope["path"])
+        budget = QUERY_BUDGETS.get((scope["method"], path))
+        if budget is not None and stats.count > budget:
+            print(f"QUERY BUDGET: {scope['method']} {path} ran {stats.count} queries (budget {budget})")
+        for sql, n in stats.repeated().items():
+            print(f"QUERY REPEATED x{n}: {scope['method']} {path}: {' '.join(sql.split())[:200]}")
@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Admission control for public endpoints: token buckets per client IP and per
+# provider slug, plus a cap on concurrent public requests. Runs as ASGI
+# middleware so rejected requests never reach a route or open a DB session.
+
+PUBLIC_PREFIXES = ("/api/public/", "/api/access-requests")
+SLUG_PATTERN = re.compile(r"^/api/public/provider/([^/]+)")
+# Writes that never reach the database (slot holds): only the per-IP limit applies,
+# plus the hold store's cap on live holds per client (MAX_HOLDS_PER_CLIENT)
+LIGHT_WRITE_PREFIXES = ("/api/public/holds",)
+
+# (tokens per second, burst capacity)
+IP_LIMIT = (float(os.getenv("RATE_LIMIT_IP_RATE", "5")), int(os.getenv("RATE_LIMIT_IP_BURST", "30")))
+IP_WRITE_LIMIT = (float(os.getenv("RATE_LIMIT_IP_WRITE_RATE", "0.2")), int(os.getenv("RATE_LIMIT_IP_WRITE_BURST", "5")))
+SLUG_LIMIT = (float(os.getenv("RATE_LIMIT_SLUG_RATE", "20")), int(os.getenv("RATE_LIMIT_SLUG_BURST", "60")))
+
+# Per worker process, like the DB pool it protects
+PUBLIC_MAX_IN_FLIGHT = int(os.getenv("PUBLIC_MAX_IN_FLIGHT", "20"))
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Reverse proxies in front of the app that append to X-Forwarded-For (0: clients
+# connect directly). TRUST_PROXY_HEADERS=true is the older spelling of 1.
+TRUSTED_PROXY_HOPS = int(os.getenv(
+    "TRUSTED_PROXY_HOPS",
+    "1" if os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true" else "0",
+))
+
+
+class RateLimitBackend:
+    """Storage for token buckets. take() returns 0 when allowed, else seconds until a token is available."""
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Per-process buckets. With several workers each one gets an equal share of
+    the configured limit, so the total stays roughly the same.
+    """
+
+    def __init__(self, max_keys: int = 100_000, workers: int = WORKERS):
+        self.max_keys = max_keys
+        self.workers = max(1, workers)
+        # key -> [tokens, last refill, rate, capacity], least recently used first
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        rate = rate / self.workers
+        capacity = max(1, capacity // self.workers)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._evict_idle(now)
+                bucket = [float(capacity), now, rate, capacity]
+                self._buckets[key] = bucket
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate
+
+    def _evict_idle(self, now: float):
+        # A bucket that has refilled completely carries no state worth keeping
+        idle = [
+            key for key, (tokens, last, rate, capacity) in self._buckets.items()
+            if tokens + (now - last) * rate >= capacity
+        ]
+        for key in idle:
+            del self._buckets[key]
+        # Many distinct keys all still refilling (rotating IPs/slugs): drop the
+        # least recently used tenth, so memory stays bounded and the scan above
+        # doesn't run again on every new key
+        if len(self._buckets) >= self.max_keys:
+            keep = self.max_keys - max(1, self.max_keys // 10)
+            while len(self._buckets) > keep:
+                self._buckets.popitem(last=False)
+
+
+class RedisBackend(RateLimitBackend):
+    """Buckets shared by all workers/instances. Uses the `redis` package."""
+
+    SCRIPT = """
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        wait = await self._script(keys=[f"ratelimit:{key}"], args=[rate, capacity, time.time()])
+        return float(wait)
+
+
+def backend_from_env() -> RateLimitBackend:
+    redis_url = os.getenv("RATE_LIMIT_REDIS_URL")
+    if redis_url:
+        return RedisBackend(redis_url)
+    return MemoryBackend()
+
+
+def client_ip(scope, trusted_hops: int = TRUSTED_PROXY_HOPS) -> str:
+    """
+    The address our outermost trusted proxy saw. Each proxy appends the peer
+    it received from, so that is the Nth entry from the right; anything left of
+    it was sent by the client and can't be trusted.
+    """
+    if trusted_hops > 0:
+        forwarded = [
+            entry.strip()
+            for name, value in scope.get("headers", [])
+            if name == b"x-forwarded-for"
+            for entry in value.decode("latin-1").split(",")
+        ]
+        forwarded = [entry for entry in forwarded if entry]
+        if forwarded:
+            return forwarded[max(0, len(forwarded) - trusted_hops)]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, backend: Optional[RateLimitBackend] = None, max_in_flight: int = PUBLIC_MAX_IN_FLIGHT):
+        self.app = app
+        self.backend = backend or backend_from_env()
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    def _limits(self, scope) -> List[Tuple[str, Tuple[float, int]]]:
+        ip = client_ip(scope)
+        limits = [(f"ip:{ip}", IP_LIMIT)]
+        if scope["method"] in ("POST", "PUT", "PATCH", "DELETE") and not scope["path"].startswith(LIGHT_WRITE_PREFIXES):
+            limits.append((f"ip-write:{ip}", IP_WRITE_LIMIT))
+        match = SLUG_PATTERN.match(scope["path"])
+        if match:
+            limits.append((f"slug:{match.group(1)}", SLUG_LIMIT))
+        return limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(PUBLIC_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # 1. Rate limits
+        for key, (rate, capacity) in self._limits(scope):
+            wait = await self.backend.take(key, rate, capacity)
+            if wait > 0:
+                await _reject(send, 429, "Too many requests", wait)
+                return
+
+        # 2. Load shedding
+        if self.in_flight >= self.max_in_flight:
+            await _reject(send, 503, "Server busy, please retry", 1)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(max(1, int(retry_after + 0.999))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,127 @@
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from .auth import create_refresh_token, decode_token
+from .models import RefreshToken, User
+
+# Refresh tokens are JWTs (typ=refresh) whose jti is stored in one indexed
+# row, so renewing an access token costs a signature check and an UPDATE on
+# the jti index instead of an Argon2 password verification.
+#
+# Every refresh rotates: the presented token is revoked and a new one issued
+# in the same family (one family per login). Presenting a revoked token again
+# means it leaked, and the whole family is revoked; a short grace window
+# tolerates two tabs refreshing at the same moment.
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+REFRESH_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "10"))
+
+
+def new_family_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def issue_refresh_token(session: Session, user_id: int, family_id: str) -> str:
+    """Insert the jti row and return the signed token. The caller commits."""
+    jti = secrets.token_urlsafe(16)
+    expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    session.add(RefreshToken(jti=jti, family_id=family_id, user_id=user_id, expires_at=expires_at))
+    return create_refresh_token(user_id, jti, family_id, expires_at)
+
+
+def revoke_token_family(session: Session, token: str) -> bool:
+    """Logout: revoke every token of the login `token` belongs to. The caller commits."""
+    payload = decode_token(token)
+    if not payload or payload.get("typ") != "refresh":
+        return False
+    return revoke_family(session, payload["fam"]) > 0
+
+
+def revoke_family(session: Session, family_id: str) -> int:
+    result = session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id)
+        .where(RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    return result.rowcount
+
+
+def revoke_user_tokens(session: Session, user_id: int, keep_family: Optional[str] = None) -> int:
+    """Sign the user out everywhere (optionally except the current login). The caller commits."""
+    query = (
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id)
+        .where(RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    if keep_family:
+        query = query.where(RefreshToken.family_id != keep_family)
+    return session.execute(query).rowcount
+
+
+def rotate_refresh_token(session: Session, token: str) -> Optional[Tuple[User, str, str]]:
+    """
+    Exchange a refresh token for a new one. Returns (user, new token, family id), or None
+    if the token is invalid, expired, revoked or its user is inactive.
+    Commits (a detected reuse must stay revoked even though the call fails).
+    """
+    payload = decode_token(token)
+    if not payload or payload.get("typ") != "refresh":
+        return None
+    jti, family_id = payload.get("jti"), payload.get("fam")
+    now = datetime.utcnow()
+
+    # Atomic claim: of two concurrent refreshes with the same token, one wins
+    claimed = session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == jti)
+        .where(RefreshToken.revoked_at.is_(None))
+        .where(RefreshToken.expires_at > now)
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id)
+    ).first()
+
+    if claimed is None:
+        family_alive = (
+            select(RefreshToken.id)
+            .where(RefreshToken.family_id == family_id)
+            .where(RefreshToken.revoked_at.is_(None))
+            .where(RefreshToken.expires_at > now)
+            .exists()
+        )
+        row = session.exec(select(RefreshToken.revoked_at, family_alive).where(RefreshToken.jti == jti)).first()
+        if row is None or row[0] is None:
+            return None  # Unknown or expired
+        revoked_at, alive = row
+        if not alive:
+            return None  # Logged out, or already revoked after a reuse
+        if revoked_at < now - timedelta(seconds=REFRESH_REUSE_GRACE_SECONDS):
+            revoke_family(session, family_id)
+            session.commit()
+            print(f"AUTH: refresh token reuse detected, revoked family {family_id}")
+            return None
+        # Rotated moments ago by a concurrent refresh (another tab): issue a sibling
+        user_id = int(payload["sub"])
+    else:
+        user_id = claimed[0]
+
+    user = session.get(User, user_id)
+    if user is None or not user.is_active:
+        session.rollback()
+        return None
+
+    new_token = issue_refresh_token(session, user_id, family_id)
+    session.commit()
+    return user, new_token, family_id
+
+
+def purge_expired_refresh_tokens(session: Session):
+    result = session.execute(delete(RefreshToken).where(RefreshToken.expires_at < datetime.utcnow()))
+    if result.rowcount:
+        print(f"Jobs: purged {result.rowcount} expired refresh tokens")
@@ -0,0 +1,49 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+def _default_utc(value: Any):
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.isoformat() + "+00:00"
+    return _default(value)
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for high-volume routes. Return it directly from the route so
+    FastAPI skips jsonable_encoder and response_model revalidation; the content
+    must already be plain dicts/lists/str/numbers (datetimes are tolerated).
+    """
+
+    naive_utc = False  # serialize naive datetimes as UTC (+00:00)
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NAIVE_UTC if self.naive_utc else None)
+        return json.dumps(
+            content,
+            default=_default_utc if self.naive_utc else _default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class UTCJSONResponse(FastJSONResponse):
+    """FastJSONResponse for rows whose naive datetimes are stored as UTC (bookings of providers with a time zone)."""
+
+    naive_utc = True
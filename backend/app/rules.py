@@ -0,0 +1,48 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, NamedTuple, Optional
+
+ACTIVE_EXCLUDED_STATUSES = ["declined", "expired"]  # Bookings in these states don't hold a slot
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BookingRules(NamedTuple):
+    """Profile.booking_rules parsed once per request into typed, validated values."""
+    min_notice: int  # minutes between now and the start of a bookable slot
+    max_advance_days: Optional[int]  # how many days ahead customers may book, None = unlimited
+    max_bookings_per_day: Optional[int]  # None = unlimited
+    hold_duration: int  # minutes a pending booking holds its slot
+
+    def earliest_start(self, now: datetime) -> datetime:
+        return now + timedelta(minutes=self.min_notice)
+
+    def allows_date(self, target_date: date, today: date) -> bool:
+        if target_date < today:
+            return False
+        if self.max_advance_days is not None and target_date > today + timedelta(days=self.max_advance_days):
+            return False
+        return True
+
+    def day_is_full(self, active_bookings: int) -> bool:
+        return self.max_bookings_per_day is not None and active_bookings >= self.max_bookings_per_day
+
+
+def compile_rules(booking_rules: Optional[Dict[str, Any]]) -> BookingRules:
+    booking_rules = booking_rules or {}
+    min_notice = _as_int(booking_rules.get("min_notice"))
+    max_advance_days = _as_int(booking_rules.get("max_advance_days"))
+    max_per_day = _as_int(booking_rules.get("max_bookings_per_day"))
+    hold_duration = _as_int(booking_rules.get("hold_duration"))
+    return BookingRules(
+        min_notice=max(0, min_notice or 0),
+        max_advance_days=max_advance_days if max_advance_days is not None and max_advance_days >= 0 else None,
+        max_bookings_per_day=max_per_day if max_per_day is not None and max_per_day > 0 else None,
+        hold_duration=hold_duration if hold_duration and hold_duration > 0 else 30,
+    )
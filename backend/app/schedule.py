@@ -0,0 +1,118 @@
+import json
+from datetime import datetime, time
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]  # index == date.weekday()
+
+Slot = Tuple[int, int, str]  # (start minute, end minute, label), minutes from local midnight
+
+
+def _minutes(value: str) -> int:
+    parsed = datetime.strptime(value, "%H:%M").time()
+    return parsed.hour * 60 + parsed.minute
+
+
+def _label(minute: int) -> str:
+    return f"{minute // 60 % 24:02d}:{minute % 60:02d}"
+
+
+def _slice(start: int, end: int, duration: int) -> List[Slot]:
+    slots = []
+    current = start
+    while current + duration <= end:
+        slots.append((current, current + duration, _label(current)))
+        current += duration
+    return slots
+
+
+class CompiledSchedule:
+    """
+    availability_config reduced to plain minute offsets per weekday: the ordered
+    slot list used by generate_slots, and a set of (start, end) pairs for
+    constant-time "is this a real slot?" checks.
+    """
+
+    def __init__(self, days: List[List[Slot]]):
+        # Stable sort keeps config order for identical start times
+        self.days: Tuple[Tuple[Slot, ...], ...] = tuple(tuple(sorted(day, key=lambda s: s[0])) for day in days)
+        self.index: Tuple[FrozenSet[Tuple[int, int]], ...] = tuple(
+            frozenset((start, end) for start, end, _ in day) for day in self.days
+        )
+
+    def slots_for(self, weekday: int) -> Tuple[Slot, ...]:
+        return self.days[weekday]
+
+    def is_slot(self, weekday: int, start_minute: int, end_minute: int) -> bool:
+        return (start_minute, end_minute) in self.index[weekday]
+
+    def matches(self, start: datetime, end: datetime) -> bool:
+        """True if start/end (local wall time) are exactly one of the generated slots."""
+        midnight = datetime.combine(start.date(), time.min)
+        start_offset = start - midnight
+        end_offset = end - midnight
+        if start_offset.seconds % 60 or end_offset.seconds % 60 or start_offset.microseconds or end_offset.microseconds:
+            return False  # Off the minute grid
+        return self.is_slot(
+            start.weekday(),
+            int(start_offset.total_seconds()) // 60,
+            int(end_offset.total_seconds()) // 60,
+        )
+
+
+def _compile(config: Dict[str, Any]) -> CompiledSchedule:
+    dur_val = config.get("slot_duration")
+    if dur_val is None:
+        dur_val = 30
+    duration_min = int(dur_val)
+    days: List[List[Slot]] = [[] for _ in WEEKDAYS]
+
+    # New Schema: "day_schedules": { "Mon": [ {type: 'window', start: '09:00', end: '12:00'} ] }
+    if "day_schedules" in config:
+        for weekday, day_name in enumerate(WEEKDAYS):
+            for block in config["day_schedules"].get(day_name) or []:
+                block_type = block.get("type", "window")
+                start_str = block.get("start")
+                if not start_str:
+                    continue
+                start = _minutes(start_str)
+
+                if block_type == "specific":
+                    # Single fixed slot; custom duration (0) falls back to 60m
+                    actual_duration = duration_min if duration_min > 0 else 60
+                    days[weekday].append((start, start + actual_duration, _label(start)))
+
+                elif block_type == "window":
+                    end_str = block.get("end")
+                    if not end_str:
+                        continue
+                    end = _minutes(end_str)
+                    if duration_min <= 0:
+                        # Custom duration: the entire window is ONE slot
+                        days[weekday].append((start, end, f"{_label(start)} - {_label(end)}"))
+                    else:
+                        days[weekday].extend(_slice(start, end, duration_min))
+
+    # Legacy Schema Fallback: "working_days": ["Mon"], "start_time": "09:00"...
+    else:
+        start = _minutes(config.get("start_time", "09:00"))
+        end = _minutes(config.get("end_time", "17:00"))
+        for day_name in config.get("working_days", []):
+            if day_name not in WEEKDAYS:
+                continue
+            if duration_min <= 0:
+                days[WEEKDAYS.index(day_name)] = [(start, end, f"{_label(start)} - {_label(end)}")]
+            else:
+                days[WEEKDAYS.index(day_name)] = _slice(start, end, duration_min)
+
+    return CompiledSchedule(days)
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(fingerprint: str) -> CompiledSchedule:
+    return _compile(json.loads(fingerprint))
+
+
+def compile_schedule(availability_config: Optional[Dict[str, Any]]) -> CompiledSchedule:
+    """Compiled once per distinct config; repeat calls cost one json.dumps and a dict lookup."""
+    return _compile_cached(json.dumps(availability_config or {}, sort_keys=True))
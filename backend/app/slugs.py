@@ -0,0 +1,87 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from .models import Profile
+
+# Slugs are normalized ASCII, and collisions are resolved as base, base-2,
+# base-3, ... Lookups use `slug IN (...)` so they are served by the unique
+# index on profile.slug (a LIKE prefix scan would not be).
+
+MAX_SLUG_LENGTH = 60
+CANDIDATES_PER_QUERY = 20
+MAX_INSERT_ATTEMPTS = 5
+
+
+def slugify(value: Optional[str], fallback: str = "provider") -> str:
+    normalized = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-z0-9]+", "-", normalized.lower()).strip("-")
+    return slug[:MAX_SLUG_LENGTH].rstrip("-") or fallback
+
+
+def _candidates(base: str, start: int) -> List[str]:
+    numbers = range(start, start + CANDIDATES_PER_QUERY)
+    return [base if n == 1 else f"{base}-{n}" for n in numbers]
+
+
+def assign_unique_slugs(session: Session, bases: List[str], assigned: Optional[Set[str]] = None) -> List[str]:
+    """
+    Free slugs for a batch of bases, in order (deterministic for the same input
+    and database state). One indexed query covers the first candidates of every
+    base; only bases with more collisions than that need another round.
+    `assigned` carries slugs handed out earlier in the same run.
+    """
+    assigned = assigned if assigned is not None else set()
+    result: List[Optional[str]] = [None] * len(bases)
+    pending = list(range(len(bases)))
+    start = 1
+    while pending:
+        window = {i: _candidates(bases[i], start) for i in pending}
+        lookup = sorted({slug for slugs in window.values() for slug in slugs})
+        taken = set(session.exec(select(Profile.slug).where(Profile.slug.in_(lookup))).all())
+        still_pending = []
+        for i in pending:
+            free = next((s for s in window[i] if s not in taken and s not in assigned), None)
+            if free is None:
+                still_pending.append(i)
+                continue
+            assigned.add(free)
+            result[i] = free
+        pending = still_pending
+        start += CANDIDATES_PER_QUERY
+    return result
+
+
+def available_slug(session: Session, base: str) -> str:
+    return assign_unique_slugs(session, [base])[0]
+
+
+def slug_taken(session: Session, slug: str, exclude_profile_id: Optional[int] = None) -> bool:
+    query = select(Profile.id).where(Profile.slug == slug)
+    if exclude_profile_id is not None:
+        query = query.where(Profile.id != exclude_profile_id)
+    return session.exec(query).first() is not None
+
+
+def insert_profile(session: Session, values: Dict[str, Any], base: str) -> Tuple[int, str]:
+    """
+    Insert a profile under the first free slug for `base`. The slug is picked
+    up front (no unique-violation round trip in the normal case); the INSERT
+    uses ON CONFLICT (slug) DO NOTHING so a concurrent insert of the same slug
+    just moves us to the next suffix instead of aborting the transaction.
+    Returns (profile id, slug).
+    """
+    for _ in range(MAX_INSERT_ATTEMPTS):
+        slug = available_slug(session, base)
+        profile_id = session.execute(
+            pg_insert(Profile)
+            .values(**values, slug=slug)
+            .on_conflict_do_nothing(index_elements=["slug"])
+            .returning(Profile.id)
+        ).scalar()
+        if profile_id is not None:
+            return profile_id, slug
+    raise RuntimeError(f"Could not allocate a slug for '{base}'")
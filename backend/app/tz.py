@@ -0,0 +1,145 @@
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Bookings are stored as naive UTC; availability is defined in the provider's
+# local wall time. Providers that never set a zone work in UTC, which makes
+# their stored times plain wall-clock times (as before zones existed); their
+# bookings are converted once they pick a zone. Offsets are resolved from a per (zone, year) table of DST
+# transitions, so converting a day's slots costs a bisect, not a tz lookup each.
+
+DEFAULT_TIMEZONE = "UTC"
+UTC = timezone.utc
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def is_valid_timezone(name: str) -> bool:
+    try:
+        get_zone(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def zone_name(value: Optional[str]) -> str:
+    return value or DEFAULT_TIMEZONE
+
+
+@lru_cache(maxsize=None)
+def fixed_zone(offset: timedelta) -> timezone:
+    return timezone(offset)
+
+
+def _offset_at(zone: ZoneInfo, utc_naive: datetime) -> timedelta:
+    return utc_naive.replace(tzinfo=UTC).astimezone(zone).utcoffset()
+
+
+@lru_cache(maxsize=512)
+def _transitions(name: str, year: int) -> Tuple[Tuple[datetime, ...], Tuple[timedelta, ...]]:
+    """
+    (transition instants, offsets) covering the year plus a day either side.
+    offsets[i] is in effect before transitions[i]; offsets[-1] after the last one.
+    """
+    zone = get_zone(name)
+    start = datetime(year, 1, 1) - timedelta(days=1)
+    end = datetime(year + 1, 1, 1) + timedelta(days=1)
+    instants = []
+    offsets = [_offset_at(zone, start)]
+    day = start
+    while day < end:
+        next_day = day + timedelta(days=1)
+        offset = _offset_at(zone, next_day)
+        if offset != offsets[-1]:
+            # Narrow the change down to the minute
+            lo, hi = day, next_day
+            while hi - lo > timedelta(minutes=1):
+                mid = lo + (hi - lo) / 2
+                if _offset_at(zone, mid) == offsets[-1]:
+                    lo = mid
+                else:
+                    hi = mid
+            instants.append(hi.replace(second=0, microsecond=0))
+            offsets.append(offset)
+        day = next_day
+    return tuple(instants), tuple(offsets)
+
+
+def utc_offset(name: str, utc_naive: datetime) -> timedelta:
+    instants, offsets = _transitions(name, utc_naive.year)
+    return offsets[bisect_right(instants, utc_naive)]
+
+
+def transitions_between(name: str, start: datetime, end: datetime) -> Tuple[List[datetime], List[timedelta]]:
+    """
+    Same shape as _transitions, but for an arbitrary naive UTC span (possibly
+    several years), for callers that convert many instants at once.
+    """
+    instants: List[datetime] = []
+    offsets = [utc_offset(name, start)]
+    for year in range(start.year, end.year + 1):
+        year_instants, year_offsets = _transitions(name, year)
+        for instant, offset in zip(year_instants, year_offsets[1:]):
+            # Neighbouring years overlap by a day; keep each change once
+            if start < instant <= end and (not instants or instant > instants[-1]) and offset != offsets[-1]:
+                instants.append(instant)
+                offsets.append(offset)
+    return instants, offsets
+
+
+def to_local(name: str, utc_naive: datetime) -> datetime:
+    """Naive UTC -> naive local wall time."""
+    return utc_naive + utc_offset(name, utc_naive)
+
+
+def to_utc(name: str, local_naive: datetime) -> Optional[datetime]:
+    """
+    Naive local wall time -> naive UTC. Returns None for times that don't exist
+    (skipped by a DST jump); ambiguous times resolve to the first occurrence.
+    """
+    instants, offsets = _transitions(name, local_naive.year)
+    if not instants:
+        return local_naive - offsets[0]
+    candidates = []
+    for offset in set(offsets):
+        utc = local_naive - offset
+        if utc + utc_offset(name, utc) == local_naive:
+            candidates.append(utc)
+    return min(candidates) if candidates else None
+
+
+def day_offset(name: str, day: date) -> Optional[timedelta]:
+    """The zone's offset if it is constant for the whole local day, else None."""
+    instants, offsets = _transitions(name, day.year)
+    midnight = datetime.combine(day, time.min)
+    # Widest possible UTC span of a local day (offsets are within +/-14h)
+    lo = bisect_right(instants, midnight - timedelta(hours=14))
+    hi = bisect_right(instants, midnight + timedelta(hours=38))
+    if lo != hi:
+        return None
+    return offsets[lo]
+
+
+def aware(local_naive: datetime, utc_naive: datetime) -> datetime:
+    """Local wall time tagged with its UTC offset (serializes as e.g. 09:00+02:00)."""
+    return local_naive.replace(tzinfo=fixed_zone(local_naive - utc_naive))
+
+
+def local_day_bounds(name: str, day: date) -> Tuple[datetime, datetime]:
+    """Naive UTC [start, end) of a local calendar day."""
+    zone = get_zone(name)
+    start = datetime.combine(day, time.min, tzinfo=zone).astimezone(UTC).replace(tzinfo=None)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=zone).astimezone(UTC).replace(tzinfo=None)
+    return start, end
+
+
+def to_utc_naive(name: str, value: datetime) -> Optional[datetime]:
+    """Normalize client input: aware values are converted, naive ones are read as provider-local."""
+    if value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return to_utc(name, value)
@@ -1,109 +1,55 @@
 from datetime import datetime, timedelta, date, time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from .models import Booking
+from .schedule import compile_schedule
+from .tz import DEFAULT_TIMEZONE, aware, day_offset, to_utc
 
 def generate_slots(
     date_obj: date, 
     availability_config: Dict[str, Any], 
-    existing_bookings: List[Booking]
+    existing_bookings: List[Booking],
+    earliest_start: Optional[datetime] = None,
+    tz_name: str = DEFAULT_TIMEZONE,
+    held: Sequence[Tuple[datetime, datetime]] = ()
 ) -> List[Dict[str, Any]]:
     """
     Generate available slots for a given date based on config and existing bookings.
     Supports legacy schema (start_time/end_time) and new flexible schema (day_schedules).
+    The schedule is in the provider's local time (`tz_name`); bookings and `earliest_start`
+    (minimum notice) are naive UTC, as are the `held` (start, end) intervals of live slot holds.
+    Returned start/end are local times with their UTC offset.
     """
     if not availability_config:
         return []
-    
-    day_name = date_obj.strftime("%a")
-    dur_val = availability_config.get("slot_duration")
-    if dur_val is None:
-        dur_val = 30
-    duration_min = int(dur_val)
-    potential_slots = []
-
-    # --- Strategy Selection ---
-    # New Schema: "day_schedules": { "Mon": [ {type: 'window', start: '09:00', end: '12:00'} ] }
-    if "day_schedules" in availability_config:
-        day_config = availability_config["day_schedules"].get(day_name, [])
-        if not day_config:
-            return [] # Not working today
-            
-        for block in day_config:
-            block_type = block.get("type", "window")
-            start_str = block.get("start")
-            
-            if not start_str: continue
-
-            start_dt = datetime.combine(date_obj, datetime.strptime(start_str, "%H:%M").time())
-            
-            if block_type == "specific":
-                # Single fixed slot
-                # If duration is custom (0), default specific slots to 30m? Or maybe 60m? 
-                # Let's use 60m as a reasonable default for a "visit", or fallback to 30.
-                actual_duration = duration_min if duration_min > 0 else 60
-                slot_end = start_dt + timedelta(minutes=actual_duration)
-                potential_slots.append({
-                    "start": start_dt,
-                    "end": slot_end,
-                    "label": start_dt.strftime("%H:%M")
-                })
-            
-            elif block_type == "window":
-                # Range of slots
-                end_str = block.get("end")
-                if not end_str: continue
-                
-                end_dt = datetime.combine(date_obj, datetime.strptime(end_str, "%H:%M").time())
-                
-                # If Duration is Custom (0), treat the entire window as ONE slot
-                if duration_min <= 0:
-                     potential_slots.append({
-                        "start": start_dt,
-                        "end": end_dt,
-                        "label": f"{start_dt.strftime('%H:%M')} - {end_dt.strftime('%H:%M')}"
-                    })
-                     continue
-
-                # Standard Fixed Slicing
-                current = start_dt
-                while current + timedelta(minutes=duration_min) <= end_dt:
-                    slot_end = current + timedelta(minutes=duration_min)
-                    potential_slots.append({
-                        "start": current,
-                        "end": slot_end,
-                        "label": current.strftime("%H:%M")
-                    })
-                    current = slot_end
 
-    # Legacy Schema Fallback: "working_days": ["Mon"], "start_time": "09:00"...
-    else:
-        working_days = availability_config.get("working_days", [])
-        if day_name not in working_days:
-            return []
+    # Slot layout comes from the compiled (cached) schedule, shared with booking validation
+    day_slots = compile_schedule(availability_config).slots_for(date_obj.weekday())
+    if not day_slots:
+        return [] # Not working today
 
-        start_str = availability_config.get("start_time", "09:00")
-        end_str = availability_config.get("end_time", "17:00")
-        
-        start_dt = datetime.combine(date_obj, datetime.strptime(start_str, "%H:%M").time())
-        end_dt = datetime.combine(date_obj, datetime.strptime(end_str, "%H:%M").time())
-        
-        current = start_dt
-        while current + timedelta(minutes=duration_min) <= end_dt:
-            slot_end = current + timedelta(minutes=duration_min)
-            potential_slots.append({
-                "start": current,
-                "end": slot_end,
-                "label": current.strftime("%H:%M")
-            })
-            current = slot_end
+    # One offset for the whole day unless a DST change falls on it
+    midnight = datetime.combine(date_obj, time.min)
+    offset = day_offset(tz_name, date_obj)
+    potential_slots = []
+    for start, end, label in day_slots:
+        local_start = midnight + timedelta(minutes=start)
+        local_end = midnight + timedelta(minutes=end)
+        if offset is not None:
+            utc_start, utc_end = local_start - offset, local_end - offset
+        else:
+            utc_start, utc_end = to_utc(tz_name, local_start), to_utc(tz_name, local_end)
+            if utc_start is None or utc_end is None:
+                continue # Skipped by the DST jump
+        potential_slots.append((utc_start, utc_end, local_start, local_end, label))
         
     # --- Filter against Bookings ---
     final_slots = []
     
-    # Sort potential slots by time to be neat
-    potential_slots.sort(key=lambda x: x["start"])
+    # potential_slots is already ordered by start time (see CompiledSchedule)
+    for utc_start, utc_end, local_start, local_end, label in potential_slots:
+        if earliest_start is not None and utc_start < earliest_start:
+            continue
 
-    for slot in potential_slots:
         is_blocked = False
         for booking in existing_bookings:
             if booking.status in ["declined", "expired"]:
@@ -113,11 +59,36 @@ def generate_slots(
             b_end = booking.end_time
             
             # Intersection Check
-            if (slot["start"] < b_end) and (slot["end"] > b_start):
+            if (utc_start < b_end) and (utc_end > b_start):
                 is_blocked = True
                 break
         
         if not is_blocked:
-            final_slots.append(slot)
+            # Short-lived holds block a slot exactly like a booking
+            is_blocked = any(utc_start < h_end and utc_end > h_start for h_start, h_end in held)
+        
+        if not is_blocked:
+            final_slots.append({
+                "start": aware(local_start, utc_start),
+                "end": aware(local_end, utc_end),
+                "label": label
+            })
             
     return final_slots
+
+
+def slots_to_json(slots: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Pre-serialize slots to plain strings so responses can skip jsonable_encoder."""
+    return [
+        {
+            "start": slot["start"].isoformat(),
+            "end": slot["end"].isoformat(),
+            "label": slot["label"],
+        }
+        for slot in slots
+    ]
+
+
+def bookings_to_json(rows, fields: List[str]) -> List[Dict[str, Any]]:
+    """Map raw (column tuple) booking rows to dicts keyed by the given field names."""
+    return [dict(zip(fields, row)) for row in rows]
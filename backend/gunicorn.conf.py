@@ -0,0 +1,34 @@
+# Production server: gunicorn master managing uvicorn worker processes.
+#   gunicorn app.main:app -c gunicorn.conf.py
+# Graceful reload (new code, no dropped requests): kill -HUP <master pid>
+import os
+
+def _cpu_count() -> int:
+    # Respect container CPU affinity where available
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", _cpu_count()))
+
+# Workers read this to size per-process state (rate limit shares, etc.)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Recycle workers periodically; jitter keeps them from restarting together
+max_requests = int(os.getenv("MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "500"))
+
+# In-flight requests and their background tasks (emails) get this long on shutdown/recycle
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = 5
+
+# No preload: every worker builds its own engine/pool after fork.
+# Total DB connections = workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
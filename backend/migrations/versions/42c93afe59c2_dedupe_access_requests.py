@@ -0,0 +1,47 @@
+"""dedupe_access_requests
+
+Revision ID: 42c93afe59c2
+Revises: 89300a79cd3c
+Create Date: 2026-10-19 16:11:08.240517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42c93afe59c2'
+down_revision: Union[str, Sequence[str], None] = '89300a79cd3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('accessrequest', sa.Column('reviewed_at', sa.DateTime(), nullable=True))
+
+    # Existing rows: normalize emails, then keep only the newest pending request
+    # per email so the unique partial index can be built
+    op.execute("UPDATE accessrequest SET email = lower(trim(email)) WHERE email <> lower(trim(email))")
+    op.execute(
+        """
+        UPDATE accessrequest SET status = 'rejected', reviewed_at = now() AT TIME ZONE 'utc'
+        WHERE status = 'pending'
+          AND id NOT IN (SELECT max(id) FROM accessrequest WHERE status = 'pending' GROUP BY email)
+        """
+    )
+
+    op.create_index('ux_accessrequest_email_pending', 'accessrequest', ['email'], unique=True, postgresql_where=sa.text("status = 'pending'"))
+    op.create_index('ix_accessrequest_email_created_at', 'accessrequest', ['email', 'created_at'], unique=False)
+    op.create_index('ix_accessrequest_status_created_at', 'accessrequest', ['status', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_accessrequest_status_created_at', table_name='accessrequest')
+    op.drop_index('ix_accessrequest_email_created_at', table_name='accessrequest')
+    op.drop_index('ux_accessrequest_email_pending', table_name='accessrequest')
+    op.drop_column('accessrequest', 'reviewed_at')
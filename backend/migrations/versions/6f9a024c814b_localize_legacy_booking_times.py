@@ -0,0 +1,54 @@
+"""localize_legacy_booking_times
+
+Revision ID: 6f9a024c814b
+Revises: 42c93afe59c2
+Create Date: 2026-10-19 18:02:41.513207
+
+"""
+import os
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f9a024c814b'
+down_revision: Union[str, Sequence[str], None] = '42c93afe59c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Bookings made before profiles had a time zone hold the provider's wall
+    # time. With LEGACY_TIMEZONE set (the zone those providers worked in),
+    # give every provider without a zone that one and convert its bookings to
+    # UTC. Without it, such providers keep wall-clock times, served without a
+    # UTC marker, until they pick a zone in their settings.
+    legacy_timezone = os.getenv("LEGACY_TIMEZONE")
+    if not legacy_timezone:
+        print("LEGACY_TIMEZONE not set: providers without a time zone keep wall-clock booking times")
+        return
+    ZoneInfo(legacy_timezone)  # Fail on a typo instead of converting with a bad zone
+
+    op.execute(
+        sa.text(
+            """
+            UPDATE booking
+            SET start_time = (booking.start_time AT TIME ZONE :tz) AT TIME ZONE 'UTC',
+                end_time = (booking.end_time AT TIME ZONE :tz) AT TIME ZONE 'UTC'
+            FROM profile
+            WHERE profile.user_id = booking.provider_id AND profile.timezone IS NULL
+            """
+        ).bindparams(tz=legacy_timezone)
+    )
+    op.execute(sa.text("UPDATE profile SET timezone = :tz WHERE timezone IS NULL").bindparams(tz=legacy_timezone))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data only: converted rows stay UTC, which the previous revision reads correctly
+    pass
@@ -0,0 +1,92 @@
+import sys
+import os
+# Add the parent directory (backend) to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from app.analytics import availability_heatmap, epoch_seconds, MAX_WEEKS
+from app.schedule import compile_schedule
+from app.tz import to_utc, to_local
+
+# Heatmap for a year of dense history: 15-minute slots 07:00-21:00 every day,
+# ~90% booked, in a DST zone. Compares the array version with the obvious
+# per-day/per-booking Python loop and checks both agree.
+# Usage: python scripts/bench_heatmap.py
+
+TZ = "Europe/Berlin"
+CONFIG = {
+    "slot_duration": 15,
+    "day_schedules": {day: [{"type": "window", "start": "07:00", "end": "21:00"}] for day in ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]},
+}
+
+
+def make_bookings(first_day: date, days: int, fill: float = 0.9):
+    schedule = compile_schedule(CONFIG)
+    rng = random.Random(42)
+    bookings = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        midnight = datetime.combine(day, datetime.min.time())
+        for start, end, _ in schedule.slots_for(day.weekday()):
+            if rng.random() < fill:
+                bookings.append((
+                    to_utc(TZ, midnight + timedelta(minutes=start)),
+                    to_utc(TZ, midnight + timedelta(minutes=end)),
+                ))
+    return bookings
+
+
+def loop_heatmap(schedule, first_day: date, weeks: int, bookings):
+    available = [[0] * 24 for _ in range(7)]
+    booked = [[0] * 24 for _ in range(7)]
+    for offset in range(weeks * 7):
+        day = first_day + timedelta(days=offset)
+        for start, end, _ in schedule.slots_for(day.weekday()):
+            for minute in range(start, end):
+                available[day.weekday()][minute // 60] += 1
+    last_day = first_day + timedelta(days=weeks * 7 - 1)
+    for start, end in bookings:
+        local = to_local(TZ, start)
+        for _ in range(int((end - start).total_seconds()) // 60):
+            if first_day <= local.date() <= last_day:
+                booked[local.weekday()][local.hour] += 1
+            local += timedelta(minutes=1)
+    return available, booked
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    weeks = MAX_WEEKS
+    first_day = date(2025, 1, 6)  # a Monday; the year crosses both DST changes
+    schedule = compile_schedule(CONFIG)
+    bookings = make_bookings(first_day, weeks * 7)
+    print(f"{weeks} weeks, {len(bookings)} bookings, zone {TZ}")
+
+    # The endpoint selects epoch seconds straight from Postgres
+    spans = [(epoch_seconds(start), epoch_seconds(end)) for start, end in bookings]
+
+    result = availability_heatmap(schedule, TZ, first_day, weeks, spans)
+    available, booked = loop_heatmap(schedule, first_day, weeks, bookings)
+    assert result["available"] == available, "available minutes differ"
+    assert result["booked"] == booked, "booked minutes differ"
+    print(f"utilisation {result['totals']['utilisation']:.1%}, results match")
+
+    vectorized_ms = timeit(lambda: availability_heatmap(schedule, TZ, first_day, weeks, spans), 10)
+    loop_ms = timeit(lambda: loop_heatmap(schedule, first_day, weeks, bookings), 3)
+    print(f"{'numpy grid':<12} {vectorized_ms:8.1f} ms")
+    print(f"{'python loop':<12} {loop_ms:8.1f} ms  ({loop_ms / vectorized_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import sys
+import os
+# Add the parent directory (backend) to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models import BookingRead
+from app.responses import FastJSONResponse
+from app.utils import slots_to_json, bookings_to_json
+
+FIELDS = list(BookingRead.model_fields)
+
+
+def make_slots(count: int):
+    start = datetime(2026, 1, 5, 0, 0)
+    slots = []
+    for i in range(count):
+        slot_start = start + timedelta(minutes=5 * i)
+        slots.append({"start": slot_start, "end": slot_start + timedelta(minutes=5), "label": slot_start.strftime("%H:%M")})
+    return slots
+
+
+def make_booking_rows(count: int):
+    start = datetime(2026, 1, 5, 9, 0)
+    rows = []
+    for i in range(count):
+        values = {
+            "customer_email": f"customer{i}@example.com",
+            "customer_name": f"Customer {i}",
+            "customer_comment": "Please ring the bell" if i % 3 == 0 else None,
+            "provider_comment": None,
+            "start_time": start + timedelta(hours=i),
+            "end_time": start + timedelta(hours=i, minutes=30),
+            "status": "confirmed",
+            "created_at": start,
+            "hold_expires_at": None,
+            "id": i + 1,
+            "provider_id": 1,
+        }
+        rows.append(tuple(values[field] for field in FIELDS))
+    return rows
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def generic_slots(slots):
+    # What FastAPI did before: jsonable_encoder then json.dumps
+    return json.dumps(jsonable_encoder(slots)).encode("utf-8")
+
+
+def generic_bookings(rows, adapter):
+    # response_model revalidation + jsonable_encoder + json.dumps
+    models = adapter.validate_python([dict(zip(FIELDS, row)) for row in rows])
+    return json.dumps(jsonable_encoder(models)).encode("utf-8")
+
+
+def main(repeat: int = 5):
+    slots = make_slots(1000)
+    rows = make_booking_rows(10000)
+    adapter = TypeAdapter(List[BookingRead])
+    fast = FastJSONResponse(None)
+
+    results = [
+        ("1k slots / generic", timeit(lambda: generic_slots(slots), repeat)),
+        ("1k slots / fast", timeit(lambda: fast.render(slots_to_json(slots)), repeat)),
+        ("10k bookings / generic", timeit(lambda: generic_bookings(rows, adapter), repeat)),
+        ("10k bookings / fast", timeit(lambda: fast.render(bookings_to_json(rows, FIELDS)), repeat)),
+    ]
+    for name, ms in results:
+        print(f"{name:<26} {ms:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
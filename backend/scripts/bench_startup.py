@@ -0,0 +1,57 @@
+import sys
+import os
+import socket
+import subprocess
+import time
+import urllib.request
+import urllib.error
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measures cold start: import time of app.main and time until the first HTTP
+# request is answered by a fresh uvicorn process. Needs a migrated database.
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_time() -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, check=True, capture_output=True)
+    return time.perf_counter() - t0
+
+
+def time_to_first_request(path: str, timeout: float = 30.0) -> float:
+    port = free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=1).read()
+                return time.perf_counter() - t0
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError("Server did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(runs: int = 5, path: str = "/healthz"):
+    imports = [import_time() for _ in range(runs)]
+    firsts = [time_to_first_request(path) for _ in range(runs)]
+    print(f"import app.main        min {min(imports) * 1000:8.1f} ms   avg {sum(imports) / runs * 1000:8.1f} ms")
+    print(f"time to first request  min {min(firsts) * 1000:8.1f} ms   avg {sum(firsts) / runs * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,85 @@
+import sys
+import os
+import http.client
+import multiprocessing
+import socket
+import subprocess
+import time
+import urllib.request
+import urllib.error
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Throughput of the gunicorn setup for 1..N workers against one path.
+#   python scripts/bench_workers.py [path] [seconds]
+# Uses keep-alive client processes; run on a machine with spare cores for the clients.
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port: int, path: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=1).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    raise RuntimeError("Server did not start")
+
+
+def client(port: int, path: str, seconds: float, counter):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    done = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        conn.request("GET", path)
+        conn.getresponse().read()
+        done += 1
+    with counter.get_lock():
+        counter.value += done
+
+
+def measure(workers: int, path: str, seconds: float, clients: int) -> float:
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), JOBS_ENABLED="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "--access-logfile", "/dev/null"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port, path)
+        counter = multiprocessing.Value("i", 0)
+        procs = [multiprocessing.Process(target=client, args=(port, path, seconds, counter)) for _ in range(clients)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        return counter.value / seconds
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(path: str = "/healthz", seconds: float = 5.0):
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    baseline = None
+    for workers in counts:
+        rps = measure(workers, path, seconds, clients=workers * 4)
+        baseline = baseline or rps
+        print(f"{workers:>3} workers  {rps:10.0f} req/s  x{rps / baseline:4.1f}")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "/healthz",
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5.0,
+    )
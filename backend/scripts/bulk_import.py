@@ -0,0 +1,78 @@
+import sys
+import os
+# Add the parent directory (backend) to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+
+from sqlmodel import Session
+from app.database import engine
+from app.bulk_import import ImportReport, import_providers, read_rows, format_for, BATCH_SIZE, HASH_WORKERS
+
+# Usage: python scripts/bulk_import.py providers.csv [--credentials-out creds.csv]
+# Columns/keys: email (required), password, business_name, business_category,
+# service_area, country, timezone, slug. Rows without a password get a generated one.
+
+
+def print_progress(report):
+    print(
+        f"\r{report.processed} rows | {report.created} created | {report.skipped} skipped | "
+        f"{len(report.errors)} errors | {report.rows_per_second:.0f} rows/s",
+        end="",
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import providers")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS)
+    parser.add_argument("--credentials-out", help="CSV file for generated passwords")
+    args = parser.parse_args()
+
+    fmt = args.format or format_for(args.path)
+    report = ImportReport()
+    finished = False
+    try:
+        with open(args.path, newline="", encoding="utf-8") as f, Session(engine) as session:
+            import_providers(
+                session,
+                read_rows(f, fmt),
+                batch_size=args.batch_size,
+                hash_workers=args.workers,
+                progress=print_progress,
+                report=report,
+            )
+        finished = True
+    finally:
+        # Also on errors/Ctrl-C: accounts of committed batches need their passwords
+        print()
+        write_report(report, args.credentials_out, finished)
+
+
+def write_report(report, credentials_out, finished):
+    for error in report.errors:
+        print(f"Row {error['row']}: {error['error']}")
+
+    if report.credentials:
+        if credentials_out:
+            with open(credentials_out, "w", newline="", encoding="utf-8") as out:
+                writer = csv.DictWriter(out, fieldnames=["email", "password"])
+                writer.writeheader()
+                writer.writerows(report.credentials)
+            print(f"Generated passwords written to {credentials_out}")
+        elif not finished:
+            # No other copy exists once the import stopped early
+            for credential in report.credentials:
+                print(f"{credential['email']},{credential['password']}")
+        else:
+            print(f"{len(report.credentials)} passwords were generated; use --credentials-out to save them")
+
+    print(f"Done: {report.created} created in {report.seconds:.1f}s ({report.rows_per_second:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
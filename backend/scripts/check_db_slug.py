@@ -1,23 +1,53 @@
+import sys
+import os
+# Add the parent directory (backend) to the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from sqlalchemy import or_, update
 from sqlmodel import Session, select
 from app.database import engine
 from app.models import Profile
+from app.slugs import slugify, assign_unique_slugs
+
+# Backfills missing slugs. Walks profiles in id order (keyset pagination), so
+# memory stays constant and each chunk is one read, one slug lookup and one
+# batched UPDATE, committed on its own.
+# Usage: python scripts/check_db_slug.py [--chunk-size 1000]
+
 
-def check_slugs():
+def check_slugs(chunk_size: int = 1000):
+    last_id = 0
+    fixed = 0
     with Session(engine) as session:
-        profiles = session.exec(select(Profile)).all()
-        print(f"Found {len(profiles)} profiles.")
-        for p in profiles:
-            print(f"ID: {p.id}, Business: {p.business_name}, Slug: {p.slug}")
-            
-            if not p.slug:
-                print("  -> Slug is missing! Generating...")
-                base_slug = p.business_name.lower().replace(" ", "-")
-                p.slug = f"{base_slug}-{p.user_id}"
-                session.add(p)
-                print(f"  -> New Slug: {p.slug}")
-        
-        session.commit()
-        print("Done.")
+        while True:
+            rows = session.exec(
+                select(Profile.id, Profile.business_name)
+                .where(or_(Profile.slug.is_(None), Profile.slug == ""))
+                .where(Profile.id > last_id)
+                .order_by(Profile.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            slugs = assign_unique_slugs(session, [slugify(name) for _, name in rows])
+            session.execute(
+                update(Profile),
+                [{"id": profile_id, "slug": slug} for (profile_id, _), slug in zip(rows, slugs)],
+            )
+            session.commit()
+
+            last_id = rows[-1][0]
+            fixed += len(rows)
+            print(f"{fixed} slugs generated (up to profile {last_id})")
+
+    print(f"Done. {fixed} profiles fixed.")
+
 
 if __name__ == "__main__":
-    check_slugs()
+    parser = argparse.ArgumentParser(description="Generate slugs for profiles that have none.")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    check_slugs(args.chunk_size)
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+# Tests run against a throwaway Postgres database (its tables are dropped and
+# recreated): TEST_DATABASE_URL=postgresql://.../workslot_test pytest
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+# One process with in-memory holds, no background jobs, no debug middlewares
+os.environ["WEB_CONCURRENCY"] = "1"
+os.environ["JOBS_ENABLED"] = "false"
+os.environ["QUERY_DEBUG"] = "false"
+os.environ["PROFILING_ENABLED"] = "false"
+os.environ.pop("HOLDS_REDIS_URL", None)
+os.environ.pop("RATE_LIMIT_REDIS_URL", None)
+
+AVAILABILITY = {
+    "slot_duration": 30,
+    "day_schedules": {day: [{"type": "window", "start": "09:00", "end": "17:00"}] for day in ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]},
+}
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from sqlmodel import SQLModel
+    from app.database import engine
+
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def session(db_engine):
+    from sqlmodel import SQLModel, Session
+
+    with Session(db_engine) as session:
+        yield session
+    with db_engine.begin() as conn:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def provider(session):
+    from app.models import Profile, User
+
+    user = User(email="provider@example.com", hashed_password="x", trial_ends_at=datetime.utcnow() + timedelta(days=30), onboarding_completed=True)
+    session.add(user)
+    session.flush()
+    session.add(Profile(
+        user_id=user.id,
+        business_name="Test Studio",
+        business_category="Beauty",
+        service_area="Berlin",
+        slug="test-studio",
+        availability_config=AVAILABILITY,
+        booking_rules={},
+    ))
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def call():
+    """Request through the app in this thread's context, so count_queries() sees its statements."""
+    import httpx
+    from app.main import app
+
+    def _call(method: str, url: str, **kwargs) -> "httpx.Response":
+        async def send():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                return await client.request(method, url, **kwargs)
+
+        return asyncio.run(send())
+
+    return _call
@@ -0,0 +1,69 @@
+from datetime import date, datetime, timedelta
+
+from app.auth import create_access_token
+from app.models import Booking
+from app.query_counter import QUERY_BUDGETS, query_budget
+
+# Per-route statement budgets on the hot paths (see QUERY_BUDGETS)
+
+DAY = date.today() + timedelta(days=7)
+
+
+def _book(session, provider, hour: int, minute: int = 0):
+    start = datetime.combine(DAY, datetime.min.time()).replace(hour=hour, minute=minute)
+    session.add(Booking(
+        provider_id=provider.id,
+        customer_email=f"customer{hour}{minute}@example.com",
+        customer_name="Customer",
+        start_time=start,
+        end_time=start + timedelta(minutes=30),
+        status="confirmed",
+    ))
+
+
+def test_slots_within_budget(session, provider, call):
+    for hour in (9, 10, 11):
+        _book(session, provider, hour)
+    session.commit()
+
+    with query_budget(2):
+        response = call("GET", "/api/public/provider/test-studio/slots", params={"date_str": DAY.isoformat()})
+
+    assert response.status_code == 200
+    labels = [slot["label"] for slot in response.json()]
+    assert "09:00" not in labels and "09:30" in labels
+    assert QUERY_BUDGETS[("GET", "/api/public/provider/{slug}/slots")] <= 2
+
+
+def test_booking_creation_within_budget(session, provider, call):
+    _book(session, provider, 9)
+    session.commit()
+    provider_id = provider.id  # Read before the block: the commit expired it
+
+    with query_budget(3):
+        response = call("POST", "/api/public/bookings", json={
+            "provider_id": provider_id,
+            "customer_email": "new@example.com",
+            "customer_name": "New Customer",
+            "start_time": f"{DAY.isoformat()}T10:00:00",
+            "end_time": f"{DAY.isoformat()}T10:30:00",
+        })
+
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "pending"
+    assert QUERY_BUDGETS[("POST", "/api/public/bookings")] <= 3
+
+
+def test_provider_bookings_has_no_repeated_statements(session, provider, call):
+    for hour in range(9, 14):
+        _book(session, provider, hour)
+    session.commit()
+    token = create_access_token({"sub": provider.email})
+
+    with query_budget(QUERY_BUDGETS[("GET", "/api/provider/bookings")]) as stats:
+        response = call("GET", "/api/provider/bookings", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    # One statement per kind, however many bookings there are (no N+1)
+    assert stats.repeated() == {}
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 import { Loader2, UserPlus } from 'lucide-react';
+import { logout } from './auth';
 
 interface AccessRequest {
     id: number;
@@ -28,6 +29,10 @@ export default function AdminDashboard() {
     const [users, setUsers] = useState<User[]>([]);
     const [isLoading, setIsLoading] = useState(true);
 
+    // Batch review of pending requests
+    const [selectedIds, setSelectedIds] = useState<number[]>([]);
+    const [isReviewing, setIsReviewing] = useState(false);
+
     // User Creation State
     const [newUserEmail, setNewUserEmail] = useState('');
     const [isCreating, setIsCreating] = useState(false);
@@ -45,6 +50,7 @@ export default function AdminDashboard() {
             if (activeTab === 'requests') {
                 const res = await axios.get('/api/admin/access-requests', config);
                 setRequests(res.data);
+                setSelectedIds([]);
             } else {
                 const res = await axios.get('/api/admin/users', config);
                 setUsers(res.data);
@@ -59,6 +65,37 @@ export default function AdminDashboard() {
         }
     };
 
+    const toggleSelected = (id: number) => {
+        setSelectedIds(selectedIds.includes(id) ? selectedIds.filter(x => x !== id) : [...selectedIds, id]);
+    };
+
+    const reviewSelected = async (action: 'approve' | 'reject') => {
+        if (selectedIds.length === 0) return;
+        setIsReviewing(true);
+        try {
+            const token = localStorage.getItem('token');
+            const res = await axios.post('/api/admin/access-requests/review', { ids: selectedIds, action }, {
+                headers: { Authorization: `Bearer ${token}` }
+            });
+            const { reviewed, credentials, existing } = res.data;
+            const messages: string[] = [];
+            if (credentials.length > 0) {
+                const list = credentials.map((c: { email: string; password: string }) => `${c.email} / ${c.password}`).join('\n');
+                messages.push(`${reviewed} approved. Temporary passwords:\n${list}`);
+            }
+            if (existing.length > 0) {
+                const emails = requests.filter((r) => existing.includes(r.id)).map((r) => r.email).join('\n');
+                messages.push(`Already have an account (no new password):\n${emails}`);
+            }
+            if (messages.length > 0) alert(messages.join('\n\n'));
+            fetchData();
+        } catch (err) {
+            alert('Failed to review requests');
+        } finally {
+            setIsReviewing(false);
+        }
+    };
+
     const handleCreateUser = async (e: React.FormEvent) => {
         e.preventDefault();
         setIsCreating(true);
@@ -92,8 +129,7 @@ export default function AdminDashboard() {
     };
 
     const handleLogout = () => {
-        localStorage.clear();
-        navigate('/login');
+        logout();
     };
 
     return (
@@ -126,9 +162,34 @@ export default function AdminDashboard() {
                 ) : (
                     <div className="bg-white rounded-xl shadow overflow-hidden">
                         {activeTab === 'requests' && (
+                            <div>
+                            <div className="p-4 border-b bg-gray-50 flex gap-2 items-center">
+                                <span className="text-sm text-gray-500 flex-1">{selectedIds.length} selected</span>
+                                <button
+                                    onClick={() => reviewSelected('approve')}
+                                    disabled={isReviewing || selectedIds.length === 0}
+                                    className="bg-green-600 text-white px-4 py-1 rounded hover:bg-green-700 disabled:opacity-50"
+                                >
+                                    Approve
+                                </button>
+                                <button
+                                    onClick={() => reviewSelected('reject')}
+                                    disabled={isReviewing || selectedIds.length === 0}
+                                    className="bg-red-600 text-white px-4 py-1 rounded hover:bg-red-700 disabled:opacity-50"
+                                >
+                                    Reject
+                                </button>
+                            </div>
                             <table className="w-full">
                                 <thead className="bg-gray-50 border-b">
                                     <tr>
+                                        <th className="p-4 w-8">
+                                            <input
+                                                type="checkbox"
+                                                checked={requests.length > 0 && selectedIds.length === requests.length}
+                                                onChange={e => setSelectedIds(e.target.checked ? requests.map(r => r.id) : [])}
+                                            />
+                                        </th>
                                         <th className="text-left p-4">Date</th>
                                         <th className="text-left p-4">Email</th>
                                         <th className="text-left p-4">Category</th>
@@ -139,6 +200,9 @@ export default function AdminDashboard() {
                                 <tbody>
                                     {requests.map(r => (
                                         <tr key={r.id} className="border-b last:border-0 hover:bg-gray-50">
+                                            <td className="p-4">
+                                                <input type="checkbox" checked={selectedIds.includes(r.id)} onChange={() => toggleSelected(r.id)} />
+                                            </td>
                                             <td className="p-4 text-sm text-gray-500">{new Date(r.created_at).toLocaleDateString()}</td>
                                             <td className="p-4 font-medium">{r.email}</td>
                                             <td className="p-4">{r.business_category}</td>
@@ -147,10 +211,11 @@ export default function AdminDashboard() {
                                         </tr>
                                     ))}
                                     {requests.length === 0 && (
-                                        <tr><td colSpan={5} className="p-8 text-center text-gray-500">No requests yet.</td></tr>
+                                        <tr><td colSpan={6} className="p-8 text-center text-gray-500">No pending requests.</td></tr>
                                     )}
                                 </tbody>
                             </table>
+                            </div>
                         )}
 
                         {activeTab === 'users' && (
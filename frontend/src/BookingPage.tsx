@@ -15,6 +15,7 @@ export default function BookingPage() {
     const [selectedDate, setSelectedDate] = useState('');
     const [slots, setSlots] = useState<Slot[]>([]);
     const [selectedSlot, setSelectedSlot] = useState<Slot | null>(null);
+    const [holdToken, setHoldToken] = useState<string | null>(null);
     const [formData, setFormData] = useState({
         name: '',
         email: '',
@@ -66,6 +67,37 @@ export default function BookingPage() {
         }
     };
 
+    // Reserve the slot for a few minutes while the form is filled in
+    const selectSlot = async (slot: Slot) => {
+        try {
+            const res = await axios.post('/api/public/holds', {
+                provider_id: profile.user_id,
+                start_time: slot.start,
+                end_time: slot.end,
+                replace_token: holdToken
+            });
+            setHoldToken(res.data.token);
+            setSelectedSlot(slot);
+        } catch (err: any) {
+            console.error(err);
+            if (err.response?.status === 409) {
+                alert('Someone else is booking this slot right now. Please pick another one.');
+                fetchSlots();
+            } else {
+                // Holding is best effort; booking still checks availability
+                setSelectedSlot(slot);
+            }
+        }
+    };
+
+    const clearSlot = () => {
+        if (holdToken) {
+            axios.delete(`/api/public/holds/${holdToken}`).catch(console.error);
+            setHoldToken(null);
+        }
+        setSelectedSlot(null);
+    };
+
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!selectedSlot) return;
@@ -78,8 +110,10 @@ export default function BookingPage() {
                 customer_email: formData.email,
                 customer_comment: formData.comment,
                 start_time: selectedSlot.start,
-                end_time: selectedSlot.end
+                end_time: selectedSlot.end,
+                hold_token: holdToken
             });
+            setHoldToken(null);
             setStatus('success');
         } catch (err) {
             console.error(err);
@@ -179,7 +213,7 @@ export default function BookingPage() {
                                         {slots.map((slot, i) => (
                                             <button
                                                 key={i}
-                                                onClick={() => setSelectedSlot(slot)}
+                                                onClick={() => selectSlot(slot)}
                                                 className="border border-blue-100 bg-blue-50 text-blue-700 py-3 rounded-lg hover:bg-blue-100 transition font-medium text-sm"
                                             >
                                                 {slot.label}
@@ -190,7 +224,7 @@ export default function BookingPage() {
                             </div>
                         ) : (
                             <div className="space-y-6">
-                                <button onClick={() => setSelectedSlot(null)} className="text-sm text-gray-500 hover:text-gray-800">
+                                <button onClick={clearSlot} className="text-sm text-gray-500 hover:text-gray-800">
                                     ← Back to slots
                                 </button>
 
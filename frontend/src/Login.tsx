@@ -19,9 +19,10 @@ export default function Login() {
             formData.append('password', password);
 
             const res = await axios.post('/api/login', formData);
-            const { access_token, is_admin } = res.data;
+            const { access_token, refresh_token, is_admin } = res.data;
 
             localStorage.setItem('token', access_token);
+            localStorage.setItem('refresh_token', refresh_token);
             localStorage.setItem('is_admin', String(is_admin));
 
             if (is_admin) {
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
 import { Loader2, Calendar, Check, X, Copy, ExternalLink, RefreshCw, Settings, Clock, Plus, Trash2, CheckCircle } from 'lucide-react';
+import { logout } from './auth';
 
 interface Booking {
     id: number;
@@ -25,6 +26,7 @@ interface Profile {
     business_category: string;
     service_area: string;
     country?: string;
+    timezone?: string;
     logo_url?: string;
     availability_config: any;
     booking_rules: any;
@@ -84,6 +86,8 @@ export default function ProviderDashboard() {
                 business_category: p.business_category,
                 service_area: p.service_area,
                 country: p.country,
+                // Left empty until the provider picks one: setting it converts existing bookings
+                timezone: p.timezone || '',
                 logo_url: p.logo_url, // NEW
                 slug: p.slug, // NEW
                 // Availability
@@ -93,6 +97,9 @@ export default function ProviderDashboard() {
                 require_payment: p.booking_rules?.require_payment || false,
                 payment_link: p.booking_rules?.payment_link || '',
                 hold_duration: p.booking_rules?.hold_duration || 30,
+                min_notice: p.booking_rules?.min_notice ?? '',
+                max_advance_days: p.booking_rules?.max_advance_days ?? '',
+                max_bookings_per_day: p.booking_rules?.max_bookings_per_day ?? '',
             });
 
             setStatus('idle');
@@ -152,6 +159,7 @@ export default function ProviderDashboard() {
                 business_category: settingsForm.business_category,
                 service_area: settingsForm.service_area,
                 country: settingsForm.country,
+                timezone: settingsForm.timezone || undefined,
                 logo_url: settingsForm.logo_url,
                 slug: settingsForm.slug,
                 new_password: settingsForm.new_password, // Optional
@@ -160,9 +168,13 @@ export default function ProviderDashboard() {
                     slot_duration: parseInt(settingsForm.slot_duration as string),
                 },
                 booking_rules: {
+                    ...(profile?.booking_rules || {}), // keep rules this form doesn't edit
                     require_payment: settingsForm.require_payment,
                     payment_link: settingsForm.payment_link,
-                    hold_duration: parseInt(settingsForm.hold_duration as string)
+                    hold_duration: parseInt(settingsForm.hold_duration as string),
+                    min_notice: settingsForm.min_notice === '' ? null : parseInt(settingsForm.min_notice as string),
+                    max_advance_days: settingsForm.max_advance_days === '' ? null : parseInt(settingsForm.max_advance_days as string),
+                    max_bookings_per_day: settingsForm.max_bookings_per_day === '' ? null : parseInt(settingsForm.max_bookings_per_day as string)
                 }
             };
 
@@ -246,7 +258,7 @@ export default function ProviderDashboard() {
                 </button>
             </div>
             <button
-                onClick={() => { localStorage.clear(); window.location.href = '/login'; }}
+                onClick={logout}
                 className="text-gray-400 hover:text-gray-600 text-sm mt-8 underline"
             >
                 Back to Login
@@ -291,7 +303,7 @@ export default function ProviderDashboard() {
                         )}
 
                         <button
-                            onClick={() => { localStorage.clear(); window.location.href = '/login'; }}
+                            onClick={logout}
                             className="text-red-500 hover:underline text-sm ml-4"
                         >
                             Logout
@@ -473,6 +485,10 @@ export default function ProviderDashboard() {
                                             <label className="block text-sm font-bold text-gray-700 mb-1">Country</label>
                                             <input type="text" value={settingsForm.country || ''} onChange={e => setSettingsForm({ ...settingsForm, country: e.target.value })} className="w-full border rounded-lg p-2.5 bg-gray-50 border-gray-300 focus:ring-2 focus:ring-blue-500 outline-none transition-all" />
                                         </div>
+                                        <div>
+                                            <label className="block text-sm font-bold text-gray-700 mb-1">Time Zone</label>
+                                            <input type="text" placeholder={`e.g. ${Intl.DateTimeFormat().resolvedOptions().timeZone}`} value={settingsForm.timezone || ''} onChange={e => setSettingsForm({ ...settingsForm, timezone: e.target.value })} className="w-full border rounded-lg p-2.5 bg-gray-50 border-gray-300 focus:ring-2 focus:ring-blue-500 outline-none transition-all" />
+                                        </div>
                                     </div>
 
                                     <div>
@@ -638,6 +654,47 @@ export default function ProviderDashboard() {
                                             />
                                         </div>
                                     </div>
+
+                                    <div className="flex items-start gap-3 pt-4 border-t border-gray-100">
+                                        <div className="pt-1">
+                                            <Calendar size={16} className="text-gray-400" />
+                                        </div>
+                                        <div className="grid grid-cols-1 sm:grid-cols-3 gap-4">
+                                            <div>
+                                                <label className="block text-sm font-bold text-gray-900">Minimum Notice</label>
+                                                <p className="text-xs text-gray-500 mb-2">Minutes before a slot starts</p>
+                                                <input
+                                                    type="number"
+                                                    min={0}
+                                                    value={settingsForm.min_notice}
+                                                    onChange={e => setSettingsForm({ ...settingsForm, min_notice: e.target.value })}
+                                                    className="w-24 border rounded-lg p-2 text-sm bg-gray-50 focus:ring-2 focus:ring-blue-500 transition-all"
+                                                />
+                                            </div>
+                                            <div>
+                                                <label className="block text-sm font-bold text-gray-900">Booking Horizon</label>
+                                                <p className="text-xs text-gray-500 mb-2">Days ahead (empty = no limit)</p>
+                                                <input
+                                                    type="number"
+                                                    min={0}
+                                                    value={settingsForm.max_advance_days}
+                                                    onChange={e => setSettingsForm({ ...settingsForm, max_advance_days: e.target.value })}
+                                                    className="w-24 border rounded-lg p-2 text-sm bg-gray-50 focus:ring-2 focus:ring-blue-500 transition-all"
+                                                />
+                                            </div>
+                                            <div>
+                                                <label className="block text-sm font-bold text-gray-900">Daily Limit</label>
+                                                <p className="text-xs text-gray-500 mb-2">Bookings per day (empty = no limit)</p>
+                                                <input
+                                                    type="number"
+                                                    min={1}
+                                                    value={settingsForm.max_bookings_per_day}
+                                                    onChange={e => setSettingsForm({ ...settingsForm, max_bookings_per_day: e.target.value })}
+                                                    className="w-24 border rounded-lg p-2 text-sm bg-gray-50 focus:ring-2 focus:ring-blue-500 transition-all"
+                                                />
+                                            </div>
+                                        </div>
+                                    </div>
                                 </div>
                             </div>
                         )}
@@ -0,0 +1,50 @@
+import axios, { AxiosError, InternalAxiosRequestConfig } from 'axios';
+
+// Access tokens last 30 minutes. On a 401 we swap the stored refresh token
+// for a new pair once (shared by all requests that failed at the same time)
+// and replay the request, so an open dashboard never has to log in again.
+
+let refreshing: Promise<string> | null = null;
+
+const refreshAccessToken = async (): Promise<string> => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) throw new Error('No refresh token');
+    const res = await axios.post('/api/token/refresh', { refresh_token: refreshToken }, { _skipRefresh: true } as any);
+    localStorage.setItem('token', res.data.access_token);
+    localStorage.setItem('refresh_token', res.data.refresh_token);
+    return res.data.access_token;
+};
+
+export const setupAuthRefresh = () => {
+    axios.interceptors.response.use(undefined, async (error: AxiosError) => {
+        const config = error.config as (InternalAxiosRequestConfig & { _skipRefresh?: boolean; _retried?: boolean }) | undefined;
+        if (error.response?.status !== 401 || !config || config._skipRefresh || config._retried || config.url === '/api/login' || !localStorage.getItem('refresh_token')) {
+            return Promise.reject(error);
+        }
+
+        try {
+            refreshing = refreshing || refreshAccessToken().finally(() => { refreshing = null; });
+            const token = await refreshing;
+            config._retried = true;
+            config.headers.Authorization = `Bearer ${token}`;
+            return axios(config);
+        } catch (refreshError) {
+            localStorage.clear();
+            window.location.href = '/login';
+            return Promise.reject(refreshError);
+        }
+    });
+};
+
+export const logout = async () => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    localStorage.clear();
+    if (refreshToken) {
+        try {
+            await axios.post('/api/logout', { refresh_token: refreshToken });
+        } catch (err) {
+            console.error(err);
+        }
+    }
+    window.location.href = '/login';
+};
@@ -3,12 +3,16 @@ import ReactDOM from 'react-dom/client'
 import App from './App.tsx'
 import './index.css'
 import axios from 'axios'
+import { setupAuthRefresh } from './auth'
 
 // Set API Base URL for Production (uses proxy in Dev)
 if (import.meta.env.VITE_API_URL) {
     axios.defaults.baseURL = import.meta.env.VITE_API_URL;
 }
 
+// Renew expired access tokens with the refresh token instead of logging out
+setupAuthRefresh();
+
 ReactDOM.createRoot(document.getElementById('root')!).render(
     <React.StrictMode>
         <App />